@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from groq import Groq
 from django.conf import settings
 from restaurants.models import Restaurant, MenuItem, Review, Reservation
@@ -9,6 +10,21 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Character budget for the menu listing sent with semantic search prompts
+MENU_CONTEXT_CHARS = 6000
+
+# System prompt for general chat; request-specific context is sent as a separate message
+CHAT_SYSTEM_PROMPT = """You are a helpful AI assistant for a restaurant management system.
+You can help with:
+- Restaurant recommendations
+- Menu suggestions
+- Reservation assistance
+- General dining questions
+- Order assistance
+
+Keep responses concise and helpful. If asked about specific restaurants or menus,
+let the user know you'd need more specific information to provide detailed recommendations."""
+
 
 class AIService:
     """
@@ -26,26 +42,14 @@ class AIService:
         General chat functionality with restaurant context
         """
         try:
-            # Build system prompt with restaurant context
-            system_prompt = """You are a helpful AI assistant for a restaurant management system. 
-            You can help with:
-            - Restaurant recommendations
-            - Menu suggestions
-            - Reservation assistance
-            - General dining questions
-            - Order assistance
-            
-            Keep responses concise and helpful. If asked about specific restaurants or menus, 
-            let the user know you'd need more specific information to provide detailed recommendations."""
-            
+            # Static system prompt, with any restaurant context as its own system message
+            messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
             if context:
-                system_prompt += f"\n\nAdditional context: {context}"
+                messages.append({"role": "system", "content": "Additional context: " + context})
+            messages.append({"role": "user", "content": message})
             
             response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": message}
-                ],
+                messages=messages,
                 model=self.model,
                 max_tokens=500,
                 temperature=0.7
@@ -365,25 +369,7 @@ Provide a JSON response with:
                         
                 except json.JSONDecodeError:
                     # Fallback analysis based on text content
-                    content = text.lower()
-                    if any(word in content for word in ['good', 'great', 'excellent', 'amazing', 'love', 'perfect', 'wonderful', 'fantastic']):
-                        sentiment = 'positive'
-                        confidence = 0.8
-                    elif any(word in content for word in ['bad', 'terrible', 'awful', 'hate', 'worst', 'horrible', 'disgusting', 'disappointing']):
-                        sentiment = 'negative'
-                        confidence = 0.8
-                    else:
-                        sentiment = 'neutral'
-                        confidence = 0.6
-                    
-                    analysis = {
-                        'sentiment': sentiment,
-                        'confidence': confidence,
-                        'emotions': {'general': confidence},
-                        'summary': f'Analyzed as {sentiment} with {confidence} confidence',
-                        'suggestions': ['AI response parsing failed. Please try again.'] if sentiment == 'negative' else [],
-                        'raw_response': response_content[:200] + '...' if len(response_content) > 200 else response_content
-                    }
+                    analysis = self._keyword_sentiment(text, response_content)
             
             return {
                 'success': True,
@@ -399,6 +385,83 @@ Provide a JSON response with:
                 'emotions': {}
             }
     
+    def analyze_sentiment_batch(self, texts, context='general'):
+        """
+        Analyze sentiment of several pieces of feedback with a single AI request.
+        Returns one result per text, in the same order and shape as analyze_sentiment.
+        """
+        if not texts:
+            return []
+        
+        try:
+            numbered = "\n\n".join(f'{i}. "{text}"' for i, text in enumerate(texts, 1))
+            prompt = f"""Analyze the sentiment of each of the following {len(texts)} texts in the context of {context}:
+
+{numbered}
+
+Provide a JSON list with exactly one object per text, in the same order. Each object has:
+- sentiment: "positive", "negative", or "neutral"
+- confidence: score from 0.0 to 1.0
+- emotions: object with emotion scores
+- summary: brief explanation of the analysis
+- suggestions: actionable suggestions based on the sentiment (if negative)"""
+            
+            response = self.client.chat.completions.create(
+                messages=[
+                    {"role": "system", "content": "You are a sentiment analysis AI. You MUST respond with ONLY valid JSON, no additional text. Start with [ and end with ]."},
+                    {"role": "user", "content": prompt}
+                ],
+                model=self.model,
+                max_tokens=400 * len(texts),
+                temperature=0.3
+            )
+            
+            response_content = response.choices[0].message.content.strip()
+            
+            try:
+                start_idx = response_content.find('[')
+                end_idx = response_content.rfind(']') + 1
+                analyses = json.loads(response_content[start_idx:end_idx]) if start_idx != -1 and end_idx != 0 else None
+            except json.JSONDecodeError:
+                analyses = None
+            
+            if not isinstance(analyses, list) or len(analyses) != len(texts):
+                # Fallback analysis based on text content
+                analyses = [self._keyword_sentiment(text, response_content) for text in texts]
+            
+            return [{'success': True, **analysis} for analysis in analyses]
+            
+        except Exception as e:
+            return [{
+                'success': False,
+                'error': f'AI service error: {str(e)}',
+                'sentiment': 'neutral',
+                'confidence': 0.0,
+                'emotions': {}
+            } for _ in texts]
+    
+    def _keyword_sentiment(self, text, response_content):
+        """Keyword-based sentiment used when the AI response cannot be parsed."""
+        content = text.lower()
+        if any(word in content for word in ['good', 'great', 'excellent', 'amazing', 'love', 'perfect', 'wonderful', 'fantastic']):
+            sentiment = 'positive'
+            confidence = 0.8
+        elif any(word in content for word in ['bad', 'terrible', 'awful', 'hate', 'worst', 'horrible', 'disgusting', 'disappointing']):
+            sentiment = 'negative'
+            confidence = 0.8
+        else:
+            sentiment = 'neutral'
+            confidence = 0.6
+        
+        return {
+            'sentiment': sentiment,
+            'confidence': confidence,
+            'emotions': {'general': confidence},
+            'summary': f'Analyzed as {sentiment} with {confidence} confidence',
+            'suggestions': ['AI response parsing failed. Please try again.'] if sentiment == 'negative' else [],
+            'raw_response': response_content[:200] + '...' if len(response_content) > 200 else response_content
+        }
+    
     def get_basic_recommendations(self, user_id=None, recommendation_type='restaurants', location=None, preferences=None):
         """Existing method unchanged, improvements below add new AI helpers."""
 
@@ -408,13 +471,14 @@ Provide a JSON response with:
             qs = MenuItem.objects.filter(is_active=True)
             if restaurant_id:
                 qs = qs.filter(restaurant_id=restaurant_id)
-            items = list(qs.select_related('restaurant', 'food_category')[:200])
-            if not items:
-                return {'success': False, 'error': 'No menu items found'}
+            items = qs.select_related('restaurant', 'food_category')[:200]
 
-            menu_context = []
-            for it in items:
-                menu_context.append({
+            # Stream items into the prompt until the character budget is used up, so
+            # the menu stays valid JSON and unused rows are never loaded
+            menu_entries = []
+            menu_size = 2
+            for it in items.iterator(chunk_size=200):
+                entry = json.dumps({
                     'id': it.id,
                     'name': it.name,
                     'description': it.description or '',
@@ -425,12 +489,18 @@ Provide a JSON response with:
                     'is_vegan': it.is_vegan,
                     'is_vegetarian': it.is_vegetarian,
                 })
+                if menu_entries and menu_size + len(entry) > MENU_CONTEXT_CHARS:
+                    break
+                menu_entries.append(entry)
+                menu_size += len(entry) + 2
+            if not menu_entries:
+                return {'success': False, 'error': 'No menu items found'}
 
             prompt = (
                 "You will receive a diner query and a list of menu items. "
                 "Return the top 5 best matches as a JSON array of objects with fields: id, name, reason, score (0-1)."
             )
-            user_text = f"Query: {query}\nMenu: {json.dumps(menu_context)[:6000]}"
+            user_text = f"Query: {query}\nMenu: [{', '.join(menu_entries)}]"
 
             response = self.client.chat.completions.create(
                 messages=[
@@ -831,4 +901,12 @@ Select only from the provided available tables."""
                     'alternative_table_id': None,
                     'factors_considered': [],
                     'error': f'AI service error: {str(e)}'
-                }
\ No newline at end of file
+                }
+
+
+@lru_cache(maxsize=1)
+def get_ai_service():
+    """
+    Shared AIService instance, so every request reuses one Groq client and its connection pool
+    """
+    return AIService()
@@ -1,4 +1,6 @@
-from django.test import TestCase
+from types import SimpleNamespace
+from unittest.mock import patch
+from django.test import SimpleTestCase, TestCase
 from django.contrib.auth import get_user_model
 from datetime import date, time
 from restaurants.models import Restaurant, Table, Category
@@ -123,4 +125,63 @@ class AITableSelectionTestCase(TestCase):
         self.assertIsNotNone(result.get('selected_table'))
         self.assertIn(result['selected_table'], available_tables)
         self.assertIn('reasoning', result)
-        self.assertIn('confidence', result)
\ No newline at end of file
+        self.assertIn('confidence', result)
+
+
+def _completion(content):
+    """Minimal stand-in for a Groq chat completion carrying the given reply text"""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class AISentimentBatchTestCase(SimpleTestCase):
+    def setUp(self):
+        """Build the service around a mocked Groq client so no API call is made"""
+        with patch('ai.services.Groq'):
+            self.ai_service = AIService()
+        self.create = self.ai_service.client.chat.completions.create
+        self.texts = ['The food was amazing!', 'Terrible service.', 'It was fine.']
+    
+    def test_batch_parses_one_result_per_text(self):
+        """A JSON list reply is returned in order, one result per text, in a single request"""
+        self.create.return_value = _completion(
+            'Here you go: [{"sentiment": "positive", "confidence": 0.9}, '
+            '{"sentiment": "negative", "confidence": 0.8}, '
+            '{"sentiment": "neutral", "confidence": 0.5}]'
+        )
+        
+        results = self.ai_service.analyze_sentiment_batch(self.texts, 'restaurant_review')
+        
+        self.assertEqual(self.create.call_count, 1)
+        self.assertEqual([r['sentiment'] for r in results], ['positive', 'negative', 'neutral'])
+        self.assertEqual([r['confidence'] for r in results], [0.9, 0.8, 0.5])
+        self.assertTrue(all(r['success'] for r in results))
+    
+    def test_batch_falls_back_to_keywords_on_bad_reply(self):
+        """Malformed or wrong-length replies fall back to keyword sentiment per text"""
+        for reply in ('not json at all', '[{"sentiment": "positive", "confidence": 0.9}]'):
+            with self.subTest(reply=reply):
+                self.create.return_value = _completion(reply)
+                
+                results = self.ai_service.analyze_sentiment_batch(self.texts)
+                
+                self.assertEqual(
+                    [r['sentiment'] for r in results], ['positive', 'negative', 'neutral']
+                )
+                self.assertEqual([r['confidence'] for r in results], [0.8, 0.8, 0.6])
+                self.assertTrue(all(r['success'] for r in results))
+                self.assertTrue(all(r['raw_response'] == reply for r in results))
+    
+    def test_batch_reports_api_errors(self):
+        """An API failure marks every result unsuccessful instead of raising"""
+        self.create.side_effect = Exception('boom')
+        
+        results = self.ai_service.analyze_sentiment_batch(self.texts)
+        
+        self.assertEqual(len(results), len(self.texts))
+        self.assertFalse(any(r['success'] for r in results))
+        self.assertTrue(all('boom' in r['error'] for r in results))
+    
+    def test_batch_of_nothing_makes_no_request(self):
+        """An empty batch returns immediately"""
+        self.assertEqual(self.ai_service.analyze_sentiment_batch([]), [])
+        self.create.assert_not_called()
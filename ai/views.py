@@ -6,7 +6,7 @@ from rest_framework import status
 from rest_framework.throttling import ScopedRateThrottle
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from .services import AIService
+from .services import get_ai_service
 from .serializers import (
     ChatSerializer,
     MenuRecommendationsSerializer,
@@ -75,7 +75,7 @@ def ai_chat(request):
     if history_text:
         combined_context = (combined_context + "\n\nRecent history:\n" + history_text).strip()
 
-    ai_service = AIService()
+    ai_service = get_ai_service()
     result = ai_service.chat(message=data['message'], user=request.user, context=combined_context)
 
     # Store user and assistant messages
@@ -136,7 +136,7 @@ def menu_recommendations(request):
     if cached:
         return Response(cached, status=status.HTTP_200_OK)
 
-    ai_service = AIService()
+    ai_service = get_ai_service()
     result = ai_service.get_menu_recommendations(
         restaurant_id=data['restaurant_id'],
         dietary_preferences=dietary_prefs,
@@ -190,7 +190,7 @@ def reservation_suggestions(request):
     serializer.is_valid(raise_exception=True)
     data = serializer.validated_data
 
-    ai_service = AIService()
+    ai_service = get_ai_service()
     result = ai_service.get_reservation_suggestions(
         restaurant_id=data['restaurant_id'],
         party_size=data['party_size'],
@@ -241,7 +241,7 @@ def sentiment_analysis(request):
     serializer.is_valid(raise_exception=True)
     data = serializer.validated_data
 
-    ai_service = AIService()
+    ai_service = get_ai_service()
     result = ai_service.analyze_sentiment(
         text=data['text'],
         context=data.get('context', 'general')
@@ -288,7 +288,7 @@ def basic_recommendations(request):
     serializer.is_valid(raise_exception=True)
     data = serializer.validated_data
 
-    ai_service = AIService()
+    ai_service = get_ai_service()
     result = ai_service.get_basic_recommendations(
         user_id=data.get('user_id', request.user.id),
         recommendation_type=data.get('recommendation_type', 'restaurants'),
@@ -315,7 +315,7 @@ def semantic_menu_search(request):
     if cached:
         return Response(cached, status=status.HTTP_200_OK)
 
-    ai_service = AIService()
+    ai_service = get_ai_service()
     result = ai_service.semantic_menu_search(query=data['query'], restaurant_id=data.get('restaurant_id'))
 
     if result.get('success'):
@@ -333,7 +333,7 @@ def upsell_recommendations(request):
     serializer.is_valid(raise_exception=True)
     data = serializer.validated_data
 
-    ai_service = AIService()
+    ai_service = get_ai_service()
     result = ai_service.upsell_recommendations(order_id=data['order_id'])
     if result.get('success'):
         return Response(result, status=status.HTTP_200_OK)
@@ -349,7 +349,7 @@ def reviews_summarize(request):
     serializer.is_valid(raise_exception=True)
     data = serializer.validated_data
 
-    ai_service = AIService()
+    ai_service = get_ai_service()
     result = ai_service.reviews_summarize(restaurant_id=data['restaurant_id'], since=data.get('since'))
     if result.get('success'):
         return Response(result, status=status.HTTP_200_OK)
@@ -365,7 +365,7 @@ def predict_wait_time(request):
     serializer.is_valid(raise_exception=True)
     data = serializer.validated_data
 
-    ai_service = AIService()
+    ai_service = get_ai_service()
     result = ai_service.predict_wait_time(
         restaurant_id=data['restaurant_id'],
         party_size=data['party_size'],
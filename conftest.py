@@ -0,0 +1,46 @@
+"""
+Shared fixtures for the API test scripts, so a single pytest run logs in and picks
+a restaurant once for all of them. They need the dev server running.
+"""
+import pytest
+
+from test_helpers import BASE_URL, TEST_PASSWORD, TEST_PHONE, bootstrap_session, new_session, server_available, warm_up
+
+
+@pytest.fixture(scope="session")
+def api_fixture():
+    """
+    Log in and pick a restaurant once per test session.
+
+    The token goes on a session of the fixtures' own rather than the shared SESSION, so
+    scripts that send requests without logging in are not authenticated by accident.
+    """
+    if not server_available(BASE_URL):
+        pytest.skip(f"Server not running on {BASE_URL}")
+    session = new_session()
+    warm_up(BASE_URL, session)
+    session, token, restaurant = bootstrap_session(BASE_URL, TEST_PHONE, TEST_PASSWORD, session=session)
+    if not token:
+        pytest.skip("Login failed")
+    if not restaurant:
+        pytest.skip("No restaurants available")
+    yield session, token, restaurant
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def session(api_fixture):
+    """Keep-alive requests session carrying the bearer token."""
+    return api_fixture[0]
+
+
+@pytest.fixture(scope="session")
+def token(api_fixture):
+    """Access token for the test customer."""
+    return api_fixture[1]
+
+
+@pytest.fixture(scope="session")
+def restaurant(api_fixture):
+    """The restaurant the reservation tests book against, as {'id', 'name'}."""
+    return api_fixture[2]
@@ -11,6 +11,9 @@ from firebase_admin import credentials, messaging
 
 logger = logging.getLogger(__name__)
 
+# FCM accepts at most this many tokens in one multicast request
+MULTICAST_BATCH_SIZE = 500
+
 
 class FirebaseService:
     """
@@ -154,57 +157,61 @@ class FirebaseService:
             logger.warning("No tokens provided for multicast notification")
             return {"success_count": 0, "failure_count": 0, "failed_tokens": []}
         
-        try:
-            # Build notification
-            notification = messaging.Notification(
-                title=title,
-                body=body,
-                image=image_url
+        # Build notification
+        notification = messaging.Notification(
+            title=title,
+            body=body,
+            image=image_url
+        )
+        android = messaging.AndroidConfig(
+            notification=messaging.AndroidNotification(
+                icon='ic_notification',
+                color='#FF6B35'  # Your app's primary color
             )
-            
-            # Build multicast message
-            message = messaging.MulticastMessage(
-                notification=notification,
-                data=data or {},
-                tokens=tokens,
-                android=messaging.AndroidConfig(
-                    notification=messaging.AndroidNotification(
-                        icon='ic_notification',
-                        color='#FF6B35'  # Your app's primary color
-                    )
-                ),
-                apns=messaging.APNSConfig(
-                    payload=messaging.APNSPayload(
-                        aps=messaging.Aps(
-                            badge=1,
-                            sound='default'
-                        )
-                    )
+        )
+        apns = messaging.APNSConfig(
+            payload=messaging.APNSPayload(
+                aps=messaging.Aps(
+                    badge=1,
+                    sound='default'
                 )
             )
-            
-            # Send multicast message
-            response = messaging.send_each_for_multicast(message)
+        )
+        
+        success_count = 0
+        failed_tokens = []
+        # Send in batches of up to MULTICAST_BATCH_SIZE tokens, one request each
+        for start in range(0, len(tokens), MULTICAST_BATCH_SIZE):
+            batch = tokens[start:start + MULTICAST_BATCH_SIZE]
+            try:
+                message = messaging.MulticastMessage(
+                    notification=notification,
+                    data=data or {},
+                    tokens=batch,
+                    android=android,
+                    apns=apns
+                )
+                response = messaging.send_each_for_multicast(message)
+            except Exception as e:
+                logger.error(f"Failed to send multicast notification: {e}")
+                failed_tokens.extend(batch)
+                continue
             
             # Collect failed tokens
-            failed_tokens = []
+            success_count += response.success_count
             if response.failure_count > 0:
                 for idx, resp in enumerate(response.responses):
                     if not resp.success:
-                        failed_tokens.append(tokens[idx])
-                        logger.error(f"Failed to send to token {tokens[idx]}: {resp.exception}")
-            
-            logger.info(f"Multicast notification sent. Success: {response.success_count}, Failed: {response.failure_count}")
-            
-            return {
-                "success_count": response.success_count,
-                "failure_count": response.failure_count,
-                "failed_tokens": failed_tokens
-            }
-            
-        except Exception as e:
-            logger.error(f"Failed to send multicast notification: {e}")
-            return {"success_count": 0, "failure_count": len(tokens), "failed_tokens": tokens}
+                        failed_tokens.append(batch[idx])
+                        logger.error(f"Failed to send to token {batch[idx]}: {resp.exception}")
+        
+        logger.info(f"Multicast notification sent. Success: {success_count}, Failed: {len(failed_tokens)}")
+        
+        return {
+            "success_count": success_count,
+            "failure_count": len(failed_tokens),
+            "failed_tokens": failed_tokens
+        }
     
     def send_topic_notification(
         self,
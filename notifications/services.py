@@ -205,16 +205,17 @@ class NotificationService:
         Returns:
             dict: Results with success_count, failure_count, and failed_tokens
         """
-        tokens = self.get_users_tokens(users)
-        if not tokens:
-            logger.warning("No FCM tokens found for provided users")
-            return {"success_count": 0, "failure_count": 0, "failed_tokens": []}
-        
-        # Create user-token mapping for logging
+        # Look up each user's tokens once, for both logging and sending
         user_tokens = {}
         for user in users:
             user_tokens[user.id] = self.get_user_tokens(user)
         
+        # De-duplicate across all users
+        tokens = list(dict.fromkeys(t for user_list in user_tokens.values() for t in user_list))
+        if not tokens:
+            logger.warning("No FCM tokens found for provided users")
+            return {"success_count": 0, "failure_count": 0, "failed_tokens": []}
+        
         # Log notifications
         logs = []
         for user in users:
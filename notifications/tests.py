@@ -1,3 +1,55 @@
-from django.test import TestCase
+from types import SimpleNamespace
+from unittest.mock import patch
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from firebase_service import MULTICAST_BATCH_SIZE, FirebaseService
+
+
+def _batch_response(results):
+    """A send_each_for_multicast response with one entry per token, True for delivered."""
+    return SimpleNamespace(
+        success_count=sum(results),
+        failure_count=len(results) - sum(results),
+        responses=[SimpleNamespace(success=ok, exception=None if ok else Exception('Unregistered')) for ok in results]
+    )
+
+
+class MulticastNotificationTestCase(SimpleTestCase):
+    def setUp(self):
+        self.service = FirebaseService()
+        # Pretend the Admin SDK is set up; every send below is patched out
+        self.service._app = object()
+
+    @patch('firebase_service.messaging.send_each_for_multicast')
+    def test_tokens_are_sent_in_batches(self, send):
+        """More than MULTICAST_BATCH_SIZE tokens are split into one request per batch"""
+        tokens = [f'token-{i}' for i in range(2 * MULTICAST_BATCH_SIZE + 1)]
+        send.side_effect = lambda message: _batch_response([True] * len(message.tokens))
+
+        result = self.service.send_multicast_notification(tokens, 'Title', 'Body')
+
+        batches = [call.args[0].tokens for call in send.call_args_list]
+        self.assertEqual(batches, [
+            tokens[:MULTICAST_BATCH_SIZE],
+            tokens[MULTICAST_BATCH_SIZE:2 * MULTICAST_BATCH_SIZE],
+            tokens[2 * MULTICAST_BATCH_SIZE:],
+        ])
+        self.assertEqual(result, {'success_count': len(tokens), 'failure_count': 0, 'failed_tokens': []})
+
+    @patch('firebase_service.messaging.send_each_for_multicast')
+    def test_failed_batch_counts_all_its_tokens_as_failed(self, send):
+        """A batch that raises fails all its tokens without stopping the other batches"""
+        tokens = [f'token-{i}' for i in range(2 * MULTICAST_BATCH_SIZE + 2)]
+        send.side_effect = [
+            _batch_response([True] * MULTICAST_BATCH_SIZE),
+            Exception('Service unavailable'),
+            _batch_response([True, False]),
+        ]
+
+        result = self.service.send_multicast_notification(tokens, 'Title', 'Body')
+
+        self.assertEqual(send.call_count, 3)
+        self.assertEqual(result['success_count'], MULTICAST_BATCH_SIZE + 1)
+        self.assertEqual(result['failure_count'], MULTICAST_BATCH_SIZE + 1)
+        self.assertEqual(result['failed_tokens'], tokens[MULTICAST_BATCH_SIZE:2 * MULTICAST_BATCH_SIZE] + [tokens[-1]])
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from restaurants.models import Reservation
+from restaurants.utils import find_overlapping_reservations
+
+
+class Command(BaseCommand):
+    help = 'List active reservations that double-book a table, so staff can resolve them'
+
+    def handle(self, *args, **options):
+        rows = Reservation.objects.filter(status__in=['pending', 'confirmed']).order_by('table_id', 'id').values_list(
+            'id', 'table_id', 'reservation_date', 'reservation_time', 'duration_hours'
+        )
+        overlaps = find_overlapping_reservations(rows.iterator())
+        if not overlaps:
+            self.stdout.write(self.style.SUCCESS('No double-booked tables found'))
+            return
+
+        reservations = Reservation.objects.select_related('customer', 'restaurant', 'table').in_bulk(
+            [reservation_id for pair in overlaps for reservation_id in pair]
+        )
+        self.stdout.write(self.style.WARNING(f'Found {len(overlaps)} double-booked reservation(s):'))
+        for reservation_id, clash in overlaps:
+            reservation = reservations[reservation_id]
+            earlier = reservations[clash]
+            self.stdout.write(
+                f'  #{reservation.id} ({reservation.customer.phone}, {reservation.reservation_date} '
+                f'{reservation.reservation_time.strftime("%H:%M")}-{reservation.end_time.strftime("%H:%M")}) '
+                f'clashes with #{earlier.id} ({earlier.customer.phone}, '
+                f'{earlier.reservation_time.strftime("%H:%M")}-{earlier.end_time.strftime("%H:%M")}) '
+                f'on {reservation.restaurant.name} table {reservation.table.table_number}'
+            )
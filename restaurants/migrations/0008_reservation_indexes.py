@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-16 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0007_customnotificationlog'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['restaurant', 'reservation_date', 'table', 'status'], name='restaurants_restaur_b4d5d7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['restaurant', 'reservation_date'], name='restaurants_restaur_8e28df_idx'),
+        ),
+    ]
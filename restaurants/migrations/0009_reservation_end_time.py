@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-16 09:30
+
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+
+
+def populate_end_time(apps, schema_editor):
+    Reservation = apps.get_model('restaurants', 'Reservation')
+    reservations = Reservation.objects.only('id', 'reservation_date', 'reservation_time', 'duration_hours')
+    for reservation in reservations.iterator():
+        start_datetime = datetime.combine(reservation.reservation_date, reservation.reservation_time)
+        reservation.end_time = (start_datetime + timedelta(hours=reservation.duration_hours)).time()
+        reservation.save(update_fields=['end_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0008_reservation_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='end_time',
+            field=models.TimeField(blank=True, editable=False, help_text='End time of the reservation, derived from reservation_time and duration_hours', null=True),
+        ),
+        migrations.RunPython(populate_end_time, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['restaurant', 'reservation_date', 'table', 'reservation_time', 'end_time'], name='restaurants_restaur_1fcfc9_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.4 on 2026-10-16 10:00
+
+from django.db import migrations
+
+
+# Active reservations on the same table may not overlap. The range is built
+# from duration_hours so reservations running past midnight are covered too.
+CREATE_NO_OVERLAP_SQL = """
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+ALTER TABLE restaurants_reservation ADD CONSTRAINT reservation_no_overlap EXCLUDE USING gist (
+    table_id WITH =,
+    tsrange(
+        reservation_date + reservation_time,
+        reservation_date + reservation_time + duration_hours * interval '1 hour'
+    ) WITH &&
+) WHERE (status IN ('pending', 'confirmed'));
+"""
+
+DROP_NO_OVERLAP_SQL = """
+ALTER TABLE restaurants_reservation DROP CONSTRAINT IF EXISTS reservation_no_overlap;
+"""
+
+
+ACTIVE_STATUSES = ('pending', 'confirmed')
+
+
+def check_no_overlapping_reservations(apps, schema_editor):
+    """
+    Stop the migration if active reservations already double-book a table.
+    
+    EXCLUDE constraints cannot be added NOT VALID, so double bookings the old
+    unlocked check let through have to be resolved by staff first; the
+    find_double_bookings command lists them.
+    """
+    from restaurants.utils import find_overlapping_reservations
+    
+    Reservation = apps.get_model('restaurants', 'Reservation')
+    rows = Reservation.objects.filter(status__in=ACTIVE_STATUSES).order_by('table_id', 'id').values_list(
+        'id', 'table_id', 'reservation_date', 'reservation_time', 'duration_hours'
+    )
+    overlaps = find_overlapping_reservations(rows.iterator())
+    if overlaps:
+        raise RuntimeError(
+            'Cannot add the reservation_no_overlap constraint: active reservations '
+            f"{', '.join(f'#{reservation_id} (clashes with #{clash})' for reservation_id, clash in overlaps)} "
+            'double-book their tables. Cancel or move them (see `manage.py find_double_bookings`) '
+            'and run the migration again.'
+        )
+
+
+def add_no_overlap_constraint(apps, schema_editor):
+    # Exclusion constraints are PostgreSQL-only; other backends rely on the
+    # row lock taken in the reservation views
+    if schema_editor.connection.vendor == 'postgresql':
+        check_no_overlapping_reservations(apps, schema_editor)
+        schema_editor.execute(CREATE_NO_OVERLAP_SQL)
+
+
+def remove_no_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_NO_OVERLAP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0009_reservation_end_time'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_no_overlap_constraint, remove_no_overlap_constraint),
+    ]
@@ -119,19 +119,37 @@ class Reservation(models.Model):
     reservation_date = models.DateField()
     reservation_time = models.TimeField()
     duration_hours = models.IntegerField(default=1, help_text="Duration of reservation in hours")
+    end_time = models.TimeField(null=True, blank=True, editable=False, help_text="End time of the reservation, derived from reservation_time and duration_hours")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     special_requests = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
-    @property
-    def end_time(self):
+    class Meta:
+        indexes = [
+            # Availability checks filter on exactly this tuple
+            models.Index(fields=['restaurant', 'reservation_date', 'table', 'status']),
+            # Date-range scans used by the bulk availability fetches
+            models.Index(fields=['restaurant', 'reservation_date']),
+            # Interval overlap lookups (reservation_time < end AND end_time > start)
+            models.Index(fields=['restaurant', 'reservation_date', 'table', 'reservation_time', 'end_time']),
+        ]
+    
+    def calculate_end_time(self):
         """Calculate the end time of the reservation"""
         from datetime import datetime, timedelta
         start_datetime = datetime.combine(self.reservation_date, self.reservation_time)
         end_datetime = start_datetime + timedelta(hours=self.duration_hours)
         return end_datetime.time()
     
+    def save(self, *args, **kwargs):
+        # Keep the persisted end_time in sync so overlap checks can run in SQL
+        self.end_time = self.calculate_end_time()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'reservation_date', 'reservation_time', 'duration_hours'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'end_time'}
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.customer} - {self.restaurant.name} - {self.reservation_date} {self.reservation_time}"
 
@@ -1,13 +1,38 @@
 """
-Signals for Restaurants app to send notifications automatically on reservation changes.
+Signals for Restaurants app to send notifications automatically on reservation changes
+and to keep cached restaurant lookups and availability responses fresh.
 """
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from .models import ReservationStatusUpdate
+from .models import Restaurant, Reservation, ReservationStatusUpdate, Table
+from .utils import invalidate_availability_cache, restaurant_cache_key
 from notifications.helpers import send_reservation_notification
 
 
+@receiver([post_save, post_delete], sender=Restaurant)
+def restaurant_invalidate_cache(sender, instance: Restaurant, **kwargs):
+    """Drop the cached active-restaurant lookup and availability when a restaurant changes."""
+    cache.delete(restaurant_cache_key(instance.pk))
+    invalidate_availability_cache(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Reservation)
+def reservation_invalidate_availability(sender, instance: Reservation, **kwargs):
+    """Drop cached availability for the restaurant once a reservation change is committed."""
+    restaurant_id = instance.restaurant_id
+    transaction.on_commit(lambda: invalidate_availability_cache(restaurant_id))
+
+
+@receiver([post_save, post_delete], sender=Table)
+def table_invalidate_availability(sender, instance: Table, **kwargs):
+    """Drop cached availability for the restaurant once a table change is committed."""
+    restaurant_id = instance.restaurant_id
+    transaction.on_commit(lambda: invalidate_availability_cache(restaurant_id))
+
+
 @receiver(post_save, sender=ReservationStatusUpdate)
 def reservation_status_update_notify(sender, instance: ReservationStatusUpdate, created, **kwargs):
     """Send notification when a ReservationStatusUpdate is created."""
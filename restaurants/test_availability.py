@@ -0,0 +1,219 @@
+"""
+Tests for reservation availability calculations
+"""
+from datetime import timedelta, time
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from restaurants.models import Restaurant, Table, Reservation
+from restaurants.utils import count_free_tables_by_duration, find_overlapping_reservations
+
+User = get_user_model()
+
+
+class ReservationAvailabilityTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+
+        self.customer = User.objects.create_user(
+            phone='+1234567890',
+            password='testpass123',
+            is_customer=True
+        )
+
+        self.restaurant = Restaurant.objects.create(
+            name='Test Restaurant',
+            address='123 Test St',
+            phone='+1987654321',
+            opening_time=time(9, 0),
+            closing_time=time(22, 0)
+        )
+
+        self.table1 = Table.objects.create(restaurant=self.restaurant, table_number='T1', capacity=2)
+        self.table2 = Table.objects.create(restaurant=self.restaurant, table_number='T2', capacity=4)
+
+        self.reservation_date = timezone.now().date() + timedelta(days=2)
+
+    def create_reservation(self, table, start, duration_hours=1, status='confirmed'):
+        """Helper to create a reservation on the test date"""
+        return Reservation.objects.create(
+            customer=self.customer,
+            restaurant=self.restaurant,
+            table=table,
+            party_size=2,
+            reservation_date=self.reservation_date,
+            reservation_time=start,
+            duration_hours=duration_hours,
+            status=status
+        )
+
+    def test_end_time_is_persisted_on_save(self):
+        """end_time is derived from start time and duration on every save"""
+        reservation = self.create_reservation(self.table1, time(18, 0), duration_hours=2)
+        self.assertEqual(reservation.end_time, time(20, 0))
+
+        reservation.duration_hours = 3
+        reservation.save(update_fields=['duration_hours'])
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.end_time, time(21, 0))
+
+    def test_available_times_counts_free_tables(self):
+        """Slots overlapping a reservation report one fewer free table"""
+        self.create_reservation(self.table1, time(18, 0), duration_hours=2)
+        self.create_reservation(self.table2, time(19, 0), status='cancelled')
+
+        response = self.client.get(
+            reverse('restaurants:available_times', args=[self.restaurant.id]),
+            {'date': self.reservation_date.strftime('%Y-%m-%d'), 'party_size': 2}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        slots = {slot['time']: slot for slot in response.data['available_times']}
+        self.assertEqual(slots['17:00']['available_tables'], 2)
+        self.assertEqual(slots['18:00']['available_tables'], 1)
+        self.assertEqual(slots['19:00']['available_tables'], 1)
+        self.assertEqual(slots['20:00']['available_tables'], 2)
+        self.assertEqual(slots['17:00']['duration_availability']['2'], 1)
+
+    def test_available_durations_stop_at_next_reservation(self):
+        """Durations running into a later reservation lose that table"""
+        self.create_reservation(self.table1, time(20, 0), duration_hours=2)
+        self.create_reservation(self.table2, time(16, 0), duration_hours=2)
+
+        response = self.client.get(
+            reverse('restaurants:available_durations', args=[self.restaurant.id]),
+            {'date': self.reservation_date.strftime('%Y-%m-%d'), 'time': '18:00', 'party_size': 2}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        durations = {d['duration']: d for d in response.data['available_durations']}
+        self.assertEqual(list(durations), [1, 2, 3, 4])
+        self.assertEqual(durations[2]['available_tables'], 2)
+        self.assertEqual(durations[3]['available_tables'], 1)
+        self.assertEqual(durations[4]['end_time'], '22:00')
+
+    def test_available_durations_cache_invalidated_by_reservation(self):
+        """Cached durations are refreshed once a new reservation is committed"""
+        url = reverse('restaurants:available_durations', args=[self.restaurant.id])
+        params = {'date': self.reservation_date.strftime('%Y-%m-%d'), 'time': '18:00', 'party_size': 2}
+
+        response = self.client.get(url, params)
+        self.assertEqual(response.data['available_durations'][0]['available_tables'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_reservation(self.table1, time(18, 0))
+
+        response = self.client.get(url, params)
+        self.assertEqual(response.data['available_durations'][0]['available_tables'], 1)
+
+    def test_available_durations_cache_invalidated_by_table_change(self):
+        """Deactivating a table refreshes cached durations once committed"""
+        url = reverse('restaurants:available_durations', args=[self.restaurant.id])
+        params = {'date': self.reservation_date.strftime('%Y-%m-%d'), 'time': '18:00', 'party_size': 2}
+
+        response = self.client.get(url, params)
+        self.assertEqual(response.data['available_durations'][0]['available_tables'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.table2.is_active = False
+            self.table2.save()
+
+        response = self.client.get(url, params)
+        self.assertEqual(response.data['available_durations'][0]['available_tables'], 1)
+
+    def test_count_free_tables_by_duration(self):
+        """Running reservations block a table outright, later ones only longer durations"""
+        intervals = [
+            (1, 16 * 60, 19 * 60),   # still running at 18:00
+            (2, 20 * 60, 22 * 60),   # starts in two hours
+            (2, 21 * 60, 22 * 60),
+            (3, 15 * 60, 17 * 60),   # already over
+        ]
+
+        counts = count_free_tables_by_duration(intervals, 18 * 60, 4, 3)
+
+        self.assertEqual(counts, [2, 2, 1, 1])
+        # Once every table is taken, longer durations are not reported
+        self.assertEqual(count_free_tables_by_duration(intervals, 18 * 60, 4, 2), [1, 1])
+        self.assertEqual(count_free_tables_by_duration([], 18 * 60, 3, 2), [2, 2, 2])
+
+    def test_find_overlapping_reservations(self):
+        """Later bookings overlapping an earlier one on the same table are reported"""
+        day = self.reservation_date
+        rows = [
+            (1, 1, day, time(18, 0), 2),
+            (2, 1, day, time(19, 0), 1),   # inside #1
+            (3, 1, day, time(20, 0), 1),   # starts as #1 ends
+            (4, 2, day, time(19, 0), 2),   # other table
+            (5, 2, day + timedelta(days=1), time(19, 0), 2),
+        ]
+
+        self.assertEqual(find_overlapping_reservations(rows), [(2, 1)])
+        self.assertEqual(find_overlapping_reservations([]), [])
+
+    def test_create_reservation_rejects_overlapping_booking(self):
+        """A second booking overlapping an active one on the same table is refused"""
+        self.client.force_authenticate(self.customer)
+        url = reverse('restaurants:create_reservation', args=[self.restaurant.id])
+        data = {
+            'selection_type': 'customized',
+            'table_id': self.table1.id,
+            'party_size': 2,
+            'date': self.reservation_date.strftime('%Y-%m-%d'),
+            'time': '18:00',
+            'duration_hours': 2
+        }
+
+        first = self.client.post(url, data, format='json')
+        second = self.client.post(url, {**data, 'time': '19:00'}, format='json')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 400)
+        self.assertIn('already reserved', second.data['error'])
+        self.assertEqual(Reservation.objects.filter(table=self.table1).count(), 1)
+
+    def test_available_tables_by_floor_groups_free_tables(self):
+        """Free tables are listed under the default floor; reserved ones are left out"""
+        self.create_reservation(self.table1, time(18, 0), duration_hours=2)
+        url = reverse('restaurants:available_tables_by_floor', args=[self.restaurant.id])
+        params = {'date': self.reservation_date.strftime('%Y-%m-%d'), 'time': '18:00', 'party_size': 2}
+
+        response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['floors'], [{
+            'floor': 'ground',
+            'floor_display': 'Ground Floor',
+            'tables': [{'id': self.table2.id, 'table_number': 'T2', 'capacity': 4}]
+        }])
+
+        response = self.client.get(url, {**params, 'party_size': 10})
+        self.assertEqual(response.data['floors'], [])
+
+    def test_available_dates_skips_fully_booked_slots(self):
+        """A slot only counts when at least one suitable table is free"""
+        self.create_reservation(self.table1, time(9, 0), duration_hours=2)
+        self.create_reservation(self.table2, time(9, 0), duration_hours=1)
+
+        response = self.client.get(
+            reverse('restaurants:available_dates', args=[self.restaurant.id]),
+            {'party_size': 2}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        dates = {d['date']: d for d in response.data['available_dates']}
+        # 13 hourly slots between 09:00 and 22:00, only 09:00 is fully booked
+        self.assertEqual(dates[self.reservation_date.strftime('%Y-%m-%d')]['available_slots'], 12)
+
+    def test_available_dates_without_suitable_tables(self):
+        """Party sizes no table can seat return no dates"""
+        response = self.client.get(
+            reverse('restaurants:available_dates', args=[self.restaurant.id]),
+            {'party_size': 10}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['available_dates'], [])
@@ -1,3 +1,96 @@
+"""
+Tests for the staff analytics dashboard
+"""
+from datetime import timedelta, time
+from decimal import Decimal
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from restaurants.models import Restaurant, MenuItem
+from orders.models import Order, OrderItem
+from accounts.models import StaffProfile
 
-# Create your tests here.
+User = get_user_model()
+
+
+class AnalyticsDashboardTestCase(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+
+        self.customer = User.objects.create_user(
+            phone='+1234567890',
+            password='testpass123',
+            is_customer=True
+        )
+
+        self.restaurant = Restaurant.objects.create(
+            name='Test Restaurant',
+            address='123 Test St',
+            phone='+1987654321',
+            opening_time=time(9, 0),
+            closing_time=time(22, 0)
+        )
+
+        self.waiter = User.objects.create_user(
+            phone='+1111111111',
+            password='waiterpass123',
+            is_staff_member=True
+        )
+        StaffProfile.objects.create(user=self.waiter, role='waiter', restaurant=self.restaurant)
+
+        self.burger = MenuItem.objects.create(restaurant=self.restaurant, name='Burger', price=Decimal('10.00'))
+        self.salad = MenuItem.objects.create(restaurant=self.restaurant, name='Salad', price=Decimal('8.00'))
+
+        self.now = timezone.localtime()
+
+    def create_order(self, items, total, status='completed', order_type='dine_in', created_at=None):
+        """Helper to create an order with (menu_item, quantity) items"""
+        order = Order.objects.create(
+            customer=self.customer,
+            restaurant=self.restaurant,
+            order_type=order_type,
+            status=status,
+            subtotal=Decimal(total),
+            tax=Decimal('0'),
+            total=Decimal(total)
+        )
+        for menu_item, quantity in items:
+            OrderItem.objects.create(order=order, menu_item=menu_item, quantity=quantity, item_price=menu_item.price)
+        if created_at is not None:
+            # created_at is auto_now_add, so move the order back in time afterwards
+            Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        return order
+
+    def test_dashboard_counts_completed_orders_in_range(self):
+        """Totals, daily buckets and popular items only cover completed orders in the range"""
+        yesterday_noon = self.now.replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        self.create_order([(self.burger, 2)], '30.00')
+        self.create_order([(self.burger, 1), (self.salad, 1)], '20.00', order_type='pickup', created_at=yesterday_noon)
+        # Excluded: not completed, or older than the requested range
+        self.create_order([(self.salad, 5)], '100.00', status='cancelled', order_type='delivery')
+        self.create_order([(self.salad, 4)], '50.00', status='pending')
+        self.create_order([(self.salad, 10)], '40.00', created_at=self.now - timedelta(days=10))
+
+        self.client.force_authenticate(self.waiter)
+        response = self.client.get(reverse('analytics_dashboard'), {'days': 7})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_orders'], 2)
+        self.assertEqual(response.data['total_sales'], Decimal('50.00'))
+        self.assertEqual(response.data['order_types'], {'dine_in': 1, 'pickup': 1, 'delivery': 0})
+
+        daily_sales = response.data['daily_sales']
+        self.assertEqual(len(daily_sales), 7)
+        self.assertEqual(daily_sales[0]['date'], self.now.strftime('%Y-%m-%d'))
+        self.assertEqual((daily_sales[0]['sales'], daily_sales[0]['count']), (Decimal('30.00'), 1))
+        self.assertEqual(daily_sales[1]['date'], yesterday_noon.strftime('%Y-%m-%d'))
+        self.assertEqual((daily_sales[1]['sales'], daily_sales[1]['count']), (Decimal('20.00'), 1))
+        self.assertTrue(all(day['sales'] == 0 and day['count'] == 0 for day in daily_sales[2:]))
+
+        self.assertEqual(response.data['popular_items'], [
+            {'name': 'Burger', 'total_quantity': 3, 'order_count': 2},
+            {'name': 'Salad', 'total_quantity': 1, 'order_count': 1},
+        ])
@@ -1,10 +1,23 @@
 """
 Utility functions for restaurant operations
 """
-from datetime import datetime
+import uuid
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.conf import settings
 
+# Seconds an active restaurant row stays cached for the reservation endpoints
+RESTAURANT_CACHE_TIMEOUT = 30
+
+# Seconds an availability response stays cached. Reservation, table and restaurant
+# changes invalidate it sooner, but a response can be up to this stale when a change
+# bypasses the model signals (e.g. queryset.update()) or the cache is not shared
+# between processes
+AVAILABILITY_CACHE_TIMEOUT = 30
+
 
 def can_cancel_reservation(reservation):
     """
@@ -100,4 +113,113 @@ def get_reservation_cancellation_info(reservation):
             'allow_same_day_cancellation': cancellation_policy.get('ALLOW_SAME_DAY_CANCELLATION', False),
             'emergency_contact_info': cancellation_policy.get('EMERGENCY_CONTACT_INFO', 'Please contact the restaurant directly'),
         }
-    }
\ No newline at end of file
+    }
+
+
+def restaurant_cache_key(restaurant_id):
+    """Cache key for an active restaurant lookup."""
+    return f"restaurant:active:{restaurant_id}"
+
+
+def availability_cache_key(restaurant_id, *params):
+    """
+    Cache key for an availability response of a restaurant.
+    
+    Args:
+        restaurant_id: Restaurant primary key
+        *params: Request parameters that identify the response
+        
+    Returns:
+        str: Key that changes whenever the restaurant's availability is invalidated
+    """
+    version = cache.get_or_set(f"availability:version:{restaurant_id}", uuid.uuid4().hex, None)
+    return ':'.join(['availability', str(restaurant_id), version] + [str(param) for param in params])
+
+
+def invalidate_availability_cache(restaurant_id):
+    """Retire every cached availability response for a restaurant."""
+    cache.set(f"availability:version:{restaurant_id}", uuid.uuid4().hex, None)
+
+
+def get_active_restaurant(restaurant_id):
+    """
+    Get an active restaurant, served from a short-lived cache.
+    
+    Args:
+        restaurant_id: Restaurant primary key
+        
+    Returns:
+        Restaurant: The active restaurant (raises Http404 if missing or inactive)
+    """
+    from .models import Restaurant
+    
+    key = restaurant_cache_key(restaurant_id)
+    restaurant = cache.get(key)
+    if restaurant is None:
+        restaurant = get_object_or_404(Restaurant, id=restaurant_id, is_active=True)
+        cache.set(key, restaurant, RESTAURANT_CACHE_TIMEOUT)
+    return restaurant
+
+
+def count_free_tables_by_duration(intervals, start_minutes, max_duration_hours, table_count):
+    """
+    Count tables free from a start time for each whole-hour duration.
+    
+    Args:
+        intervals: Iterable of (table_id, start_minutes, end_minutes) for existing
+            reservations on the candidate tables, in minutes since midnight
+        start_minutes: Requested start time in minutes since midnight
+        max_duration_hours: Longest duration to check
+        table_count: Number of candidate tables
+        
+    Returns:
+        list: Free table count for durations 1..max_duration_hours, in order, ending
+            before the first duration with no free table
+    """
+    # A reservation still running at the start blocks its table outright, a later one
+    # only blocks durations that run past its start
+    free_until = {}
+    for table_id, res_start, res_end in intervals:
+        if res_end <= start_minutes:
+            continue
+        table_free_until = max(res_start, start_minutes)
+        if table_id not in free_until or table_free_until < free_until[table_id]:
+            free_until[table_id] = table_free_until
+    if not free_until:
+        return [table_count] * max_duration_hours if table_count else []
+    blocked_from = sorted(free_until.values())
+    
+    counts = []
+    for duration in range(1, max_duration_hours + 1):
+        free_count = table_count - bisect_left(blocked_from, start_minutes + duration * 60)
+        if free_count <= 0:
+            # Longer durations cover this window too, so they can't free a table up
+            break
+        counts.append(free_count)
+    return counts
+
+
+def find_overlapping_reservations(rows):
+    """
+    Find active reservations that double-book a table.
+    
+    Args:
+        rows: Iterable of (id, table_id, reservation_date, reservation_time,
+            duration_hours), ordered by table_id then id
+        
+    Returns:
+        list: (reservation_id, clashing_id) pairs, where clashing_id is an
+            earlier-made reservation on the same table that overlaps it
+    """
+    booked_by_table = {}
+    overlaps = []
+    for reservation_id, table_id, reservation_date, reservation_time, duration_hours in rows:
+        start = datetime.combine(reservation_date, reservation_time)
+        end = start + timedelta(hours=duration_hours)
+        booked = booked_by_table.setdefault(table_id, [])
+        clash = next((booked_id for booked_id, booked_start, booked_end in booked if start < booked_end and booked_start < end), None)
+        if clash is None:
+            booked.append((reservation_id, start, end))
+        else:
+            overlaps.append((reservation_id, clash))
+    return overlaps
@@ -1,5 +1,9 @@
+from collections import defaultdict
+
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Avg, Q
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Exists, OuterRef, Q
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
@@ -11,13 +15,27 @@ from drf_yasg import openapi
 import pytz
 
 from .models import Restaurant, Category, MenuItem, Table, Reservation, Review, ReservationStatusUpdate
+from .utils import (
+    AVAILABILITY_CACHE_TIMEOUT, availability_cache_key, count_free_tables_by_duration, get_active_restaurant
+)
 from accounts.models import User, StaffProfile
 from accounts.permissions import IsSuperAdmin, IsRestaurantManager, IsWaiterOrChef, IsCustomer, IsStaffMember, IsRestaurantStaff
 from orders.models import Order, OrderItem, OrderStatusUpdate
-from ai.services import AIService
+from ai.services import get_ai_service
 from ai.models import TableSelectionLog
 import time
 
+# Reservation slots are evaluated in GMT+3 (Etc/GMT-3 means +3 hours from GMT)
+GMT_PLUS_3 = pytz.timezone('Etc/GMT-3')
+
+# Table rows no longer carry a floor column (removed in migration 0005), so every
+# table is reported on this floor
+DEFAULT_FLOOR = 'ground'
+DEFAULT_FLOOR_DISPLAY = 'Ground Floor'
+
+# Name of the PostgreSQL exclusion constraint that rejects double bookings (migration 0010)
+NO_OVERLAP_CONSTRAINT = 'reservation_no_overlap'
+
 # Helper: mark expired reservations as completed
 
 def _mark_expired_reservations():
@@ -254,6 +272,7 @@ def available_tables(request, restaurant_id):
     _mark_expired_reservations()
     """Get available tables for a restaurant on a specific date and time"""
     restaurant = get_object_or_404(Restaurant, id=restaurant_id, is_active=True)
+    now = timezone.now()
     
     # Get date from query parameters (default to today)
     date_str = request.GET.get('date', None)
@@ -263,7 +282,7 @@ def available_tables(request, restaurant_id):
         except ValueError:
             return Response({'error': 'Invalid date format, use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
     else:
-        reservation_date = timezone.now().date()
+        reservation_date = now.date()
     
     # Get time from query parameters (default to now)
     time_str = request.GET.get('time', None)
@@ -273,7 +292,7 @@ def available_tables(request, restaurant_id):
         except ValueError:
             return Response({'error': 'Invalid time format, use HH:MM'}, status=status.HTTP_400_BAD_REQUEST)
     else:
-        reservation_time = timezone.now().time()
+        reservation_time = now.time()
     
     # Get party size (default to 2)
     party_size = int(request.GET.get('party_size', 2))
@@ -293,32 +312,17 @@ def available_tables(request, restaurant_id):
     end_datetime = reservation_datetime + timedelta(hours=duration)
     end_time = end_datetime.time()
     
-    # Exclude tables that are already reserved during the requested time period
-    # We need to check for overlapping reservations considering duration
-    reserved_table_ids = []
-    
-    for table in tables:
-        # Get all reservations for this table on the requested date
-        existing_reservations = Reservation.objects.filter(
-            restaurant=restaurant,
-            reservation_date=reservation_date,
-            status__in=['pending', 'confirmed'],
-            table=table
-        )
-        
-        # Check if any existing reservation overlaps with our requested time slot
-        for reservation in existing_reservations:
-            existing_start = reservation.reservation_time
-            existing_duration = getattr(reservation, 'duration_hours', 2)  # Default to 2 hours if not set
-            existing_end_datetime = datetime.combine(reservation_date, existing_start) + timedelta(hours=existing_duration)
-            existing_end = existing_end_datetime.time()
-            
-            # Check for overlap: new reservation overlaps if it starts before existing ends and ends after existing starts
-            if (reservation_time < existing_end and end_time > existing_start):
-                reserved_table_ids.append(table.id)
-                break
-    
-    available_tables = tables.exclude(id__in=reserved_table_ids)
+    # Exclude tables that are already reserved during the requested time period:
+    # a reservation overlaps if it starts before ours ends and ends after ours starts
+    overlapping_reservations = Reservation.objects.filter(
+        table=OuterRef('pk'),
+        restaurant=restaurant,
+        reservation_date=reservation_date,
+        status__in=['pending', 'confirmed'],
+        reservation_time__lt=end_time,
+        end_time__gt=reservation_time
+    )
+    available_tables = tables.filter(~Exists(overlapping_reservations))
     
     data = []
     for table in available_tables:
@@ -477,17 +481,6 @@ def create_reservation(request, restaurant_id):
         if party_size > table.capacity:
             return Response({'error': 'Table capacity is not sufficient for your party size'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check for conflicts on the chosen table
-        conflicting_reservations = Reservation.objects.filter(
-            table=table,
-            reservation_date=reservation_date,
-            status__in=['pending', 'confirmed']
-        )
-        for existing in conflicting_reservations:
-            existing_end_time = existing.end_time
-            if (reservation_time < existing_end_time and end_time > existing.reservation_time):
-                return Response({'error': f'Table is already reserved from {existing.reservation_time.strftime("%H:%M")} to {existing_end_time.strftime("%H:%M")}'}, status=status.HTTP_400_BAD_REQUEST)
-
     elif selection_type == 'smart':
         # Build candidate tables
         candidate_tables = Table.objects.filter(
@@ -495,20 +488,14 @@ def create_reservation(request, restaurant_id):
             is_active=True,
             capacity__gte=party_size
         )
-        available_tables = []
-        for t in candidate_tables:
-            overlaps = False
-            existing_reservations = Reservation.objects.filter(
-                table=t,
-                reservation_date=reservation_date,
-                status__in=['pending', 'confirmed']
-            )
-            for r in existing_reservations:
-                if (reservation_time < r.end_time and end_time > r.reservation_time):
-                    overlaps = True
-                    break
-            if not overlaps:
-                available_tables.append(t)
+        overlapping_reservations = Reservation.objects.filter(
+            table=OuterRef('pk'),
+            reservation_date=reservation_date,
+            status__in=['pending', 'confirmed'],
+            reservation_time__lt=end_time,
+            end_time__gt=reservation_time
+        )
+        available_tables = list(candidate_tables.filter(~Exists(overlapping_reservations)))
         
         if not available_tables:
             return Response({'error': 'No available tables for the selected time and party size'}, status=status.HTTP_400_BAD_REQUEST)
@@ -518,7 +505,7 @@ def create_reservation(request, restaurant_id):
         special_occasion = request.data.get('special_occasion', '')
         
         # Initialize AI service and track timing
-        ai_service = AIService()
+        ai_service = get_ai_service()
         start_time = time.time()
         
         # Try AI-powered table selection
@@ -563,18 +550,39 @@ def create_reservation(request, restaurant_id):
     else:
         return Response({'error': "Invalid selection_type. Use 'customized' or 'smart'"}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Create the reservation
-    reservation = Reservation.objects.create(
-        customer=user,
-        restaurant=restaurant,
-        table=table,
-        party_size=party_size,
-        reservation_date=reservation_date,
-        reservation_time=reservation_time,
-        duration_hours=duration,
-        status='pending',
-        special_requests=request.data.get('special_requests', '')
-    )
+    # Check for conflicts on the chosen table and create the reservation while
+    # holding a lock on the table row, so concurrent requests cannot double-book it
+    try:
+        with transaction.atomic():
+            Table.objects.select_for_update().get(pk=table.pk)
+            
+            existing = Reservation.objects.filter(
+                table=table,
+                reservation_date=reservation_date,
+                status__in=['pending', 'confirmed'],
+                reservation_time__lt=end_time,
+                end_time__gt=reservation_time
+            ).first()
+            if existing:
+                return Response({'error': f'Table is already reserved from {existing.reservation_time.strftime("%H:%M")} to {existing.end_time.strftime("%H:%M")}'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            reservation = Reservation.objects.create(
+                customer=user,
+                restaurant=restaurant,
+                table=table,
+                party_size=party_size,
+                reservation_date=reservation_date,
+                reservation_time=reservation_time,
+                duration_hours=duration,
+                status='pending',
+                special_requests=request.data.get('special_requests', '')
+            )
+    except IntegrityError as e:
+        # Rejected by the database-level no-overlap constraint
+        if NO_OVERLAP_CONSTRAINT in str(e):
+            return Response({'error': 'Table is already reserved for the selected time'}, status=status.HTTP_400_BAD_REQUEST)
+        # Re-raise other integrity errors
+        raise
 
     # Auto-approve if the user is a manager
     if user.is_staff_member and user.staff_profile.role == 'manager':
@@ -1476,14 +1484,15 @@ def analytics_dashboard(request):
     
     # Get analytics data
     from orders.models import Order
-    from datetime import datetime, timedelta
     
     # Get time range from request or default to last 7 days
     days = int(request.GET.get('days', 7))
     if days > 30:  # Limit to 30 days for performance
         days = 30
     
-    start_date = datetime.now() - timedelta(days=days)
+    now = timezone.localtime()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    start_date = now - timedelta(days=days)
     
     # Get orders in time range
     orders = Order.objects.filter(
@@ -1492,9 +1501,12 @@ def analytics_dashboard(request):
         status__in=['completed', 'paid']  # Only count completed orders
     )
     
-    # Calculate basic stats
-    total_orders = orders.count()
-    total_sales = sum(order.total for order in orders)
+    from django.db.models import Sum, Count, F
+    
+    # Calculate basic stats in the database rather than over Order instances
+    totals = orders.aggregate(total_sales=Sum('total'), total_orders=Count('id'))
+    total_orders = totals['total_orders']
+    total_sales = totals['total_sales'] or 0
     
     # Order types breakdown
     dine_in_count = orders.filter(order_type='dine_in').count()
@@ -1502,38 +1514,39 @@ def analytics_dashboard(request):
     delivery_count = orders.filter(order_type='delivery').count()
     
     # Popular items
-    from django.db.models import Sum, Count
     from orders.models import OrderItem
     
-    popular_items = OrderItem.objects.filter(
-        order__in=orders
+    # Filter through the order join rather than a nested subquery or an id list
+    popular_items_data = list(OrderItem.objects.filter(
+        order__restaurant=restaurant,
+        order__created_at__gte=start_date,
+        order__status__in=['completed', 'paid']
     ).values(
-        'menu_item__name'
+        name=F('menu_item__name')
     ).annotate(
         total_quantity=Sum('quantity'),
         order_count=Count('order', distinct=True)
-    ).order_by('-total_quantity')[:5]
-    
-    popular_items_data = []
-    for item in popular_items:
-        popular_items_data.append({
-            'name': item['menu_item__name'],
-            'total_quantity': item['total_quantity'],
-            'order_count': item['order_count'],
-        })
+    ).order_by('-total_quantity')[:5])
+    
+    # Daily sales (one GROUP BY query instead of two queries per day)
+    from django.db.models.functions import TruncDate
+    
+    sales_by_day = {
+        row['day']: row
+        for row in orders.annotate(day=TruncDate('created_at')).values('day').annotate(
+            sales=Sum('total'),
+            count=Count('id')
+        ).order_by('day')
+    }
     
-    # Daily sales
     daily_sales = []
     for i in range(days):
-        day = datetime.now() - timedelta(days=i)
-        day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day.replace(hour=23, minute=59, second=59, microsecond=999999)
-        
-        day_orders = orders.filter(created_at__gte=day_start, created_at__lte=day_end)
+        day_start = today_start - timedelta(days=i)
+        day_totals = sales_by_day.get(day_start.date(), {'sales': 0, 'count': 0})
         daily_sales.append({
-            'date': day.strftime('%Y-%m-%d'),
-            'sales': sum(order.total for order in day_orders),
-            'count': day_orders.count(),
+            'date': day_start.strftime('%Y-%m-%d'),
+            'sales': day_totals['sales'],
+            'count': day_totals['count'],
         })
     
     # Return analytics data
@@ -1587,7 +1600,7 @@ def available_dates(request, restaurant_id):
     Get available dates for reservation based on party size.
     Shows dates for the next 30 days with available time slots.
     """
-    restaurant = get_object_or_404(Restaurant, id=restaurant_id, is_active=True)
+    restaurant = get_active_restaurant(restaurant_id)
     
     # Get party size (no limits as requested)
     party_size = int(request.GET.get('party_size', 1))
@@ -1596,66 +1609,56 @@ def available_dates(request, restaurant_id):
     available_dates = []
     today = timezone.now().date()
     
+    # Find tables that can accommodate the party size
+    suitable_tables = Table.objects.filter(
+        restaurant=restaurant,
+        is_active=True,
+        capacity__gte=party_size
+    )
+    suitable_table_ids = list(suitable_tables.values_list('id', flat=True))
+    
+    if not suitable_table_ids:
+        return Response({
+            'available_dates': [],
+            'message': f'No tables available for {party_size} guests'
+        }, status=status.HTTP_200_OK)
+    
+    # Hourly slots from opening to closing time, as (start, end) minutes since midnight
+    opening_minutes = restaurant.opening_time.hour * 60 + restaurant.opening_time.minute
+    closing_minutes = restaurant.closing_time.hour * 60 + restaurant.closing_time.minute
+    slots = [(m, (m + 60) % (24 * 60)) for m in range(opening_minutes, closing_minutes, 60)]
+    all_slots_mask = (1 << len(slots)) - 1
+    
+    # Fetch every active reservation in the window once and fold it into a
+    # bitmask of busy slots per (date, table)
+    busy_masks = defaultdict(int)
+    window_reservations = Reservation.objects.filter(
+        restaurant=restaurant,
+        reservation_date__range=(today, today + timedelta(days=29)),
+        status__in=['pending', 'confirmed'],
+        table__capacity__gte=party_size
+    ).values_list('reservation_date', 'table_id', 'reservation_time', 'end_time')
+    for r_date, r_table_id, r_start, r_end in window_reservations:
+        r_start_minutes = r_start.hour * 60 + r_start.minute
+        r_end_minutes = r_end.hour * 60 + r_end.minute
+        for bit, (slot_start, slot_end) in enumerate(slots):
+            if r_start_minutes < slot_end and r_end_minutes > slot_start:
+                busy_masks[(r_date, r_table_id)] |= 1 << bit
+    
     for i in range(30):  # Next 30 days
         check_date = today + timedelta(days=i)
         
-        # Skip past dates
-        if check_date < today:
-            continue
-            
-        # Find tables that can accommodate the party size
-        suitable_tables = Table.objects.filter(
-            restaurant=restaurant,
-            is_active=True,
-            capacity__gte=party_size
-        )
-        
-        if not suitable_tables.exists():
-            continue
-            
-        # Check how many time slots are available for this date
-        available_slots = 0
-        
-        # Generate time slots from opening to closing time (every hour)
-        opening_time = restaurant.opening_time
-        closing_time = restaurant.closing_time
-        
-        # Convert times to datetime for easier calculation
-        current_time = datetime.combine(check_date, opening_time)
-        end_time = datetime.combine(check_date, closing_time)
-        
-        while current_time < end_time:
-            slot_time = current_time.time()
-            
-            # Consider a 1-hour slot window for date-level availability
-            slot_end_time = (current_time + timedelta(hours=1)).time()
-            
-            # Determine if at least one table is free for the entire 1-hour window
-            any_table_free = False
-            for t in suitable_tables:
-                conflicts = Reservation.objects.filter(
-                    restaurant=restaurant,
-                    reservation_date=check_date,
-                    table=t,
-                    status__in=['pending', 'confirmed']
-                )
-                has_overlap = False
-                for r in conflicts:
-                    if r.reservation_time < slot_end_time and r.end_time > slot_time:
-                        has_overlap = True
-                        break
-                if not has_overlap:
-                    any_table_free = True
-                    break
-            
-            if any_table_free:
-                available_slots += 1
-                
-            current_time += timedelta(hours=1)
+        # A slot is available if at least one suitable table is free for the whole hour
+        free_mask = 0
+        for t_id in suitable_table_ids:
+            free_mask |= all_slots_mask & ~busy_masks.get((check_date, t_id), 0)
+            if free_mask == all_slots_mask:
+                break
+        available_slots = bin(free_mask).count('1')
         
         if available_slots > 0:
             available_dates.append({
-                'date': check_date.strftime('%Y-%m-%d'),
+                'date': check_date.isoformat(),
                 'available_slots': available_slots,
                 'day_name': check_date.strftime('%A')
             })
@@ -1710,7 +1713,7 @@ def available_times(request, restaurant_id):
     Get available time slots for a specific date and party size.
     Takes into account reservation duration to avoid overlaps and calculates slot capacity.
     """
-    restaurant = get_object_or_404(Restaurant, id=restaurant_id, is_active=True)
+    restaurant = get_active_restaurant(restaurant_id)
     
     # Get parameters
     date_str = request.GET.get('date')
@@ -1727,8 +1730,10 @@ def available_times(request, restaurant_id):
     except ValueError:
         return Response({'error': 'Invalid date format, use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
     
+    now = timezone.now()
+    
     # Check if date is in the past
-    if reservation_date < timezone.now().date():
+    if reservation_date < now.date():
         return Response({'error': 'Cannot check availability for past dates'}, status=status.HTTP_400_BAD_REQUEST)
     
     # Find tables that can accommodate the party size
@@ -1737,91 +1742,78 @@ def available_times(request, restaurant_id):
         is_active=True,
         capacity__gte=party_size
     )
+    table_ids = list(suitable_tables.values_list('id', flat=True))
     
-    if not suitable_tables.exists():
+    if not table_ids:
         return Response({
             'available_times': [],
             'message': f'No tables available for {party_size} guests'
         }, status=status.HTTP_200_OK)
     
-    # Generate time slots
+    # Generate time slots, as minutes since midnight
     available_times = []
-    opening_time = restaurant.opening_time
-    closing_time = restaurant.closing_time
+    opening_minutes = restaurant.opening_time.hour * 60 + restaurant.opening_time.minute
+    closing_minutes = restaurant.closing_time.hour * 60 + restaurant.closing_time.minute
     
-    # Convert times to datetime for easier calculation
-    current_time = datetime.combine(reservation_date, opening_time)
-    close_dt = datetime.combine(reservation_date, closing_time)
+    # Load the day's reservations once and bucket their intervals per table,
+    # as (start, end) minutes since midnight sorted by start
+    intervals_by_table = defaultdict(list)
+    res_rows = Reservation.objects.filter(
+        restaurant=restaurant,
+        reservation_date=reservation_date,
+        status__in=['pending', 'confirmed'],
+        table_id__in=table_ids
+    ).values_list('table_id', 'reservation_time', 'end_time')
+    for r_table_id, r_start, r_end in res_rows:
+        intervals_by_table[r_table_id].append((r_start.hour * 60 + r_start.minute, r_end.hour * 60 + r_end.minute))
+    for intervals in intervals_by_table.values():
+        intervals.sort()
+    
+    # Tables with no reservations that day are free until closing from every slot
+    unreserved_count = len(set(table_ids) - intervals_by_table.keys())
+    
+    # Skip past time slots if reservation date is today (GMT+3)
+    current_datetime_gmt3 = now.astimezone(GMT_PLUS_3)
+    if reservation_date == current_datetime_gmt3.date():
+        past_cutoff_minutes = current_datetime_gmt3.hour * 60 + current_datetime_gmt3.minute
+    else:
+        past_cutoff_minutes = -1
     
-    # Ensure a slot can fit entirely before closing
-    while current_time + timedelta(hours=duration) <= close_dt:
-        slot_time = current_time.time()
-        end_time = (current_time + timedelta(hours=duration)).time()
-        
-        # Skip past time slots if reservation date is today (GMT+3)
-        gmt_plus_3 = pytz.timezone('Etc/GMT-3')  # Note: GMT-3 means +3 hours from GMT
-        current_datetime_gmt3 = timezone.now().astimezone(gmt_plus_3)
-        current_date_gmt3 = current_datetime_gmt3.date()
+    # Hourly slots that fit entirely before closing
+    for slot_minutes in range(opening_minutes, closing_minutes - duration * 60 + 1, 60):
+        if slot_minutes <= past_cutoff_minutes:
+            continue
         
-        if reservation_date == current_date_gmt3:
-            slot_datetime = datetime.combine(reservation_date, slot_time)
-            slot_datetime_gmt3 = gmt_plus_3.localize(slot_datetime)
-            if slot_datetime_gmt3 <= current_datetime_gmt3:
-                current_time += timedelta(hours=1)
-                continue
+        # Minutes each table stays free from this slot (capped at closing). The
+        # first reservation still running after the slot starts is the earliest
+        # one that can block it, since intervals are sorted by start.
+        max_hours = (closing_minutes - slot_minutes) // 60
+        free_minutes = [closing_minutes - slot_minutes] * unreserved_count
+        for intervals in intervals_by_table.values():
+            free_until = closing_minutes
+            for r_start, r_end in intervals:
+                if r_end > slot_minutes:
+                    free_until = min(free_until, r_start)
+                    break
+            free_minutes.append(free_until - slot_minutes)
         
         # Count how many tables are free for the whole duration window
-        free_tables_count = 0
-        for t in suitable_tables:
-            overlaps = Reservation.objects.filter(
-                restaurant=restaurant,
-                reservation_date=reservation_date,
-                table=t,
-                status__in=['pending', 'confirmed']
-            ).filter(
-                reservation_time__lt=end_time,
-            )
-            is_conflict = False
-            for r in overlaps:
-                if r.reservation_time < end_time and r.end_time > slot_time:
-                    is_conflict = True
-                    break
-            if not is_conflict:
-                free_tables_count += 1
+        free_tables_count = sum(1 for m in free_minutes if m >= duration * 60)
         
         if free_tables_count > 0:
             # Build per-duration availability counts for this slot
-            max_hours = int((close_dt - current_time).total_seconds() // 3600)
-            duration_availability = {}
-            for d in range(1, max_hours + 1):
-                slot_end_for_d = (current_time + timedelta(hours=d)).time()
-                count_for_d = 0
-                for t in suitable_tables:
-                    conflicts = Reservation.objects.filter(
-                        restaurant=restaurant,
-                        reservation_date=reservation_date,
-                        table=t,
-                        status__in=['pending', 'confirmed']
-                    ).filter(
-                        reservation_time__lt=slot_end_for_d,
-                    )
-                    has_overlap = False
-                    for r in conflicts:
-                        if r.reservation_time < slot_end_for_d and r.end_time > slot_time:
-                            has_overlap = True
-                            break
-                    if not has_overlap:
-                        count_for_d += 1
-                duration_availability[str(d)] = count_for_d
+            duration_availability = {
+                str(d): sum(1 for m in free_minutes if m >= d * 60)
+                for d in range(1, max_hours + 1)
+            }
             
+            slot_hour, slot_minute = divmod(slot_minutes, 60)
             available_times.append({
-                'time': slot_time.strftime('%H:%M'),
-                'display_time': slot_time.strftime('%I:%M %p'),
+                'time': f'{slot_hour:02d}:{slot_minute:02d}',
+                'display_time': f'{(slot_hour % 12) or 12:02d}:{slot_minute:02d} {"AM" if slot_hour < 12 else "PM"}',
                 'available_tables': free_tables_count,
                 'duration_availability': duration_availability
             })
-        
-        current_time += timedelta(hours=1)
     
     return Response({
         'available_times': available_times,
@@ -1887,7 +1879,7 @@ def available_tables_by_floor(request, restaurant_id):
     """
     Get available tables grouped by floor for a specific date, time, party size, and duration.
     """
-    restaurant = get_object_or_404(Restaurant, id=restaurant_id, is_active=True)
+    restaurant = get_active_restaurant(restaurant_id)
     
     # Get parameters
     date_str = request.GET.get('date')
@@ -1927,60 +1919,26 @@ def available_tables_by_floor(request, restaurant_id):
     )
     
     # Find tables that are NOT reserved during the requested time period
-    conflicting_reservations = Reservation.objects.filter(
+    overlapping_reservations = Reservation.objects.filter(
+        table=OuterRef('pk'),
         restaurant=restaurant,
         reservation_date=reservation_date,
         status__in=['pending', 'confirmed'],
-        table__in=suitable_tables
-    ).filter(
-        # Check for time overlap
+        # Time overlap, evaluated against the persisted end_time column
         reservation_time__lt=end_time,
-        # Using the end_time property we added to the model
+        end_time__gt=reservation_time
     )
     
-    # Get tables that have conflicting reservations
-    reserved_table_ids = []
-    for reservation in conflicting_reservations:
-        # Check if there's actual time overlap
-        existing_end_time = reservation.end_time
-        if (reservation.reservation_time < end_time and 
-            existing_end_time > reservation_time):
-            reserved_table_ids.append(reservation.table_id)
-    
     # Get available tables
-    available_tables = suitable_tables.exclude(id__in=reserved_table_ids)
+    available_tables = suitable_tables.filter(~Exists(overlapping_reservations)).values('id', 'table_number', 'capacity')
     
-    # Group tables by floor
-    floors_data = {}
-    for table in available_tables:
-        floor_key = table.floor
-        floor_display = table.get_floor_display()
-        
-        if floor_key not in floors_data:
-            floors_data[floor_key] = {
-                'floor': floor_key,
-                'floor_display': floor_display,
-                'tables': []
-            }
-        
-        floors_data[floor_key]['tables'].append({
-            'id': table.id,
-            'table_number': table.table_number,
-            'capacity': table.capacity,
-        })
-    
-    # Convert to list and sort by floor order
-    floor_order = ['ground', 'first', 'second', 'third', 'fourth', 'rooftop']
-    floors_list = []
-    
-    for floor_key in floor_order:
-        if floor_key in floors_data:
-            floors_list.append(floors_data[floor_key])
-    
-    # Add any floors not in the standard order
-    for floor_key, floor_data in floors_data.items():
-        if floor_key not in floor_order:
-            floors_list.append(floor_data)
+    # Every table is on DEFAULT_FLOOR, so there is at most one floor group
+    tables = list(available_tables)
+    floors_list = [{
+        'floor': DEFAULT_FLOOR,
+        'floor_display': DEFAULT_FLOOR_DISPLAY,
+        'tables': tables
+    }] if tables else []
     
     return Response({
         'floors': floors_list,
@@ -2050,7 +2008,7 @@ def create_enhanced_reservation(request, restaurant_id):
     """
     Create a new reservation with enhanced features including duration and floor selection.
     """
-    restaurant = get_object_or_404(Restaurant, id=restaurant_id, is_active=True)
+    restaurant = get_active_restaurant(restaurant_id)
     user = request.user
     
     # Permission check (same as original)
@@ -2114,43 +2072,51 @@ def create_enhanced_reservation(request, restaurant_id):
         return Response({'error': 'Invalid date or time format'}, status=status.HTTP_400_BAD_REQUEST)
     
     # Check if date/time is in the past
-    reservation_datetime = timezone.make_aware(datetime.combine(reservation_date, reservation_time))
-    if reservation_datetime < timezone.now():
+    reservation_datetime_naive = datetime.combine(reservation_date, reservation_time)
+    if timezone.make_aware(reservation_datetime_naive) < timezone.now():
         return Response({'error': 'Cannot make reservation for past date/time'}, status=status.HTTP_400_BAD_REQUEST)
     
     # Calculate end time
-    reservation_datetime_naive = datetime.combine(reservation_date, reservation_time)
-    end_datetime = reservation_datetime_naive + timedelta(hours=duration)
-    end_time = end_datetime.time()
-    
-    # Check for conflicting reservations
-    conflicting_reservations = Reservation.objects.filter(
-        table=table,
-        reservation_date=reservation_date,
-        status__in=['pending', 'confirmed']
-    )
+    end_time = (reservation_datetime_naive + timedelta(hours=duration)).time()
     
-    for existing_reservation in conflicting_reservations:
-        existing_end_time = existing_reservation.end_time
-        # Check for time overlap
-        if (reservation_time < existing_end_time and 
-            end_time > existing_reservation.reservation_time):
-            return Response({
-                'error': f'Table is already reserved from {existing_reservation.reservation_time.strftime("%H:%M")} to {existing_end_time.strftime("%H:%M")}'
-            }, status=status.HTTP_400_BAD_REQUEST)
-    
-    # Create the reservation
-    reservation = Reservation.objects.create(
-        customer=user,
-        restaurant=restaurant,
-        table=table,
-        party_size=party_size,
-        reservation_date=reservation_date,
-        reservation_time=reservation_time,
-        duration_hours=duration,
-        status='pending',
-        special_requests=special_requests
-    )
+    try:
+        with transaction.atomic():
+            # Lock the table row so concurrent bookings of this table are serialised
+            # between the conflict check and the insert
+            Table.objects.select_for_update().get(pk=table.pk)
+        
+            # Check for conflicting reservations (time overlap evaluated in SQL)
+            existing_reservation = Reservation.objects.filter(
+                table=table,
+                reservation_date=reservation_date,
+                status__in=['pending', 'confirmed'],
+                reservation_time__lt=end_time,
+                end_time__gt=reservation_time
+            ).first()
+        
+            if existing_reservation:
+                return Response({
+                    'error': f'Table is already reserved from {existing_reservation.reservation_time.strftime("%H:%M")} to {existing_reservation.end_time.strftime("%H:%M")}'
+                }, status=status.HTTP_400_BAD_REQUEST)
+        
+            # Create the reservation
+            reservation = Reservation.objects.create(
+                customer=user,
+                restaurant=restaurant,
+                table=table,
+                party_size=party_size,
+                reservation_date=reservation_date,
+                reservation_time=reservation_time,
+                duration_hours=duration,
+                status='pending',
+                special_requests=special_requests
+            )
+    except IntegrityError as e:
+        # Rejected by the database-level no-overlap constraint
+        if NO_OVERLAP_CONSTRAINT in str(e):
+            return Response({'error': 'Table is already reserved for the selected time'}, status=status.HTTP_400_BAD_REQUEST)
+        # Re-raise other integrity errors
+        raise
     
     # Auto-approve if the user is a manager
     if user.is_staff_member and hasattr(user, 'staff_profile') and user.staff_profile.role == 'manager':
@@ -2178,7 +2144,7 @@ def create_enhanced_reservation(request, restaurant_id):
             'end_time': end_time.strftime('%H:%M'),
             'table': {
                 'number': table.table_number,
-                'floor': table.get_floor_display(),
+                'floor': DEFAULT_FLOOR_DISPLAY,
                 'capacity': table.capacity,
             },
             'special_requests': reservation.special_requests,
@@ -2238,7 +2204,7 @@ def available_durations(request, restaurant_id):
     Get available reservation durations for a specific date, time, and party size.
     Shows how long a reservation can be based on restaurant closing time and other reservations.
     """
-    restaurant = get_object_or_404(Restaurant, id=restaurant_id, is_active=True)
+    restaurant = get_active_restaurant(restaurant_id)
     
     # Get parameters
     date_str = request.GET.get('date')
@@ -2260,14 +2226,21 @@ def available_durations(request, restaurant_id):
     if reservation_datetime < timezone.now():
         return Response({'error': 'Cannot check availability for past date/time'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Find tables that can accommodate the party size
-    suitable_tables = Table.objects.filter(
+    # Booking screens poll this endpoint; serve repeats from cache for up to
+    # AVAILABILITY_CACHE_TIMEOUT seconds, or until a reservation or table change invalidates it
+    cache_key = availability_cache_key(restaurant.id, 'durations', reservation_date.isoformat(), time_str, party_size)
+    cached_data = cache.get(cache_key)
+    if cached_data is not None:
+        return Response(cached_data, status=status.HTTP_200_OK)
+    
+    # Find tables that can accommodate the party size (only their ids are needed)
+    suitable_table_ids = set(Table.objects.filter(
         restaurant=restaurant,
         is_active=True,
         capacity__gte=party_size
-    )
+    ).values_list('id', flat=True))
     
-    if not suitable_tables.exists():
+    if not suitable_table_ids:
         return Response({
             'available_durations': [],
             'message': f'No tables available for {party_size} guests'
@@ -2293,58 +2266,46 @@ def available_durations(request, restaurant_id):
             'message': 'No time available before restaurant closes'
         }, status=status.HTTP_200_OK)
     
+    # Get the day's reservations on suitable tables once, with only the columns the overlap check needs
+    all_reservations = Reservation.objects.filter(
+        restaurant=restaurant,
+        reservation_date=reservation_date,
+        table_id__in=suitable_table_ids,
+        status__in=['pending', 'confirmed']
+    ).values_list('table_id', 'reservation_time', 'duration_hours')
+    
+    our_start = reservation_time.hour * 60 + reservation_time.minute
+    
+    # Existing reservations as (table, start, end) in minutes since midnight
+    intervals = [
+        (r_table_id, r_start.hour * 60 + r_start.minute, r_start.hour * 60 + r_start.minute + r_hours * 60)
+        for r_table_id, r_start, r_hours in all_reservations
+    ]
+    
+    free_counts = count_free_tables_by_duration(intervals, our_start, max_duration_hours, len(suitable_table_ids))
+    
     # Check each possible duration (1 to max_duration_hours)
     available_durations = []
     
-    for duration in range(1, max_duration_hours + 1):
+    # Durations stop at the first one with no free table
+    for duration, available_count in enumerate(free_counts, 1):
         # Calculate end time for this duration
-        end_datetime = reservation_datetime_naive + timedelta(hours=duration)
-        end_time = end_datetime.time()
-        
-        # Find tables that are NOT reserved during this entire time period
-        # Get all reservations for this date
-        all_reservations = Reservation.objects.filter(
-            restaurant=restaurant,
-            reservation_date=reservation_date,
-            status__in=['pending', 'confirmed']
-        )
-        
-        # Check for overlapping reservations manually
-        conflicting_reservation_ids = []
-        for res in all_reservations:
-            # Calculate existing reservation end time
-            res_start = datetime.combine(reservation_date, res.reservation_time)
-            res_end = res_start + timedelta(hours=res.duration_hours)
-            
-            # Calculate our proposed reservation times
-            our_start = datetime.combine(reservation_date, reservation_time)
-            our_end = datetime.combine(reservation_date, end_time)
-            
-            # Check for overlap: reservations overlap if one starts before the other ends
-            if (our_start < res_end) and (our_end > res_start):
-                conflicting_reservation_ids.append(res.id)
-        
-        conflicting_reservations = Reservation.objects.filter(id__in=conflicting_reservation_ids)
+        our_end = our_start + duration * 60
         
-        reserved_table_ids = conflicting_reservations.values_list('table_id', flat=True)
-        available_tables_for_duration = suitable_tables.exclude(id__in=reserved_table_ids)
-        available_count = available_tables_for_duration.count()
+        # Create display text
+        if duration == 1:
+            display_text = "1 hour"
+        else:
+            display_text = f"{duration} hours"
         
-        if available_count > 0:
-            # Create display text
-            if duration == 1:
-                display_text = "1 hour"
-            else:
-                display_text = f"{duration} hours"
-            
-            available_durations.append({
-                'duration': duration,
-                'end_time': end_time.strftime('%H:%M'),
-                'available_tables': available_count,
-                'display_text': display_text
-            })
+        available_durations.append({
+            'duration': duration,
+            'end_time': f'{our_end // 60 % 24:02d}:{our_end % 60:02d}',
+            'available_tables': available_count,
+            'display_text': display_text
+        })
     
-    return Response({
+    response_data = {
         'available_durations': available_durations,
         'date': reservation_date.strftime('%Y-%m-%d'),
         'time': reservation_time.strftime('%H:%M'),
@@ -2354,4 +2315,7 @@ def available_durations(request, restaurant_id):
             'name': restaurant.name,
             'closing_time': restaurant.closing_time.strftime('%H:%M'),
         }
-    }, status=status.HTTP_200_OK)
+    }
+    cache.set(cache_key, response_data, AVAILABILITY_CACHE_TIMEOUT)
+    
+    return Response(response_data, status=status.HTTP_200_OK)
@@ -9,11 +9,13 @@ Comprehensive test script for all AI features:
 
 import os
 import django
+from django.apps import apps
 from django.conf import settings
 
 # Setup Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rms.settings')
-django.setup()
+if not apps.ready:
+    django.setup()
 
 from ai.services import AIRecommendationService, AIReservationService, AISentimentService
 from restaurants.models import Restaurant, MenuItem
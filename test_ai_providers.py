@@ -6,11 +6,13 @@ Run this to test which AI providers are available and working.
 
 import os
 import django
+from django.apps import apps
 from django.conf import settings
 
 # Setup Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rms.settings')
-django.setup()
+if not apps.ready:
+    django.setup()
 
 from ai.services import AIClientFactory, GroqClient, OpenAIClient, GROQ_AVAILABLE, OPENAI_AVAILABLE, GROQ_API_KEY, OPENAI_API_KEY
 
@@ -5,15 +5,31 @@ Test script to verify AI integration with restaurant database.
 
 import os
 import django
+from django.apps import apps
 from django.conf import settings
 
 # Setup Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rms.settings')
-django.setup()
+if not apps.ready:
+    django.setup()
 
 from ai.views import get_restaurant_context
 from ai.services import get_ai_client
 
+SYSTEM_PROMPT_TEMPLATE = """You are an AI assistant for a Restaurant Management System. 
+You have access to real restaurant data and should provide helpful, accurate information.
+
+AVAILABLE RESTAURANT DATA:
+{context}
+
+Instructions:
+- Use the provided restaurant data to answer questions about specific restaurants, menus, prices, and availability
+- If asked about restaurants not in the data, politely say you don't have information about that specific restaurant
+- For general dining questions, provide helpful advice
+- Be friendly and helpful
+- Always mention specific prices, restaurant names, and menu items when relevant
+"""
+
 def test_database_context():
     """Test the restaurant context function."""
     print("🍽️  Testing Restaurant Database Context")
@@ -43,19 +59,7 @@ def test_ai_with_context():
         print("\n1. Question: 'What restaurants do you have available?'")
         context = get_restaurant_context("What restaurants do you have available?")
         
-        system_prompt = f"""You are an AI assistant for a Restaurant Management System. 
-You have access to real restaurant data and should provide helpful, accurate information.
-
-AVAILABLE RESTAURANT DATA:
-{context}
-
-Instructions:
-- Use the provided restaurant data to answer questions about specific restaurants, menus, prices, and availability
-- If asked about restaurants not in the data, politely say you don't have information about that specific restaurant
-- For general dining questions, provide helpful advice
-- Be friendly and helpful
-- Always mention specific prices, restaurant names, and menu items when relevant
-"""
+        system_prompt = SYSTEM_PROMPT_TEMPLATE.format(context=context)
         
         messages = [
             {"role": "system", "content": system_prompt},
@@ -71,19 +75,7 @@ Instructions:
         print("2. Question: 'What can you tell me about Tasty Bites menu and prices?'")
         context = get_restaurant_context("What can you tell me about Tasty Bites menu and prices?")
         
-        system_prompt = f"""You are an AI assistant for a Restaurant Management System. 
-You have access to real restaurant data and should provide helpful, accurate information.
-
-AVAILABLE RESTAURANT DATA:
-{context}
-
-Instructions:
-- Use the provided restaurant data to answer questions about specific restaurants, menus, prices, and availability
-- If asked about restaurants not in the data, politely say you don't have information about that specific restaurant
-- For general dining questions, provide helpful advice
-- Be friendly and helpful
-- Always mention specific prices, restaurant names, and menu items when relevant
-"""
+        system_prompt = SYSTEM_PROMPT_TEMPLATE.format(context=context)
         
         messages = [
             {"role": "system", "content": system_prompt},
@@ -3,142 +3,152 @@
 Test script to verify the updated Postman collection with AI features
 """
 import json
-import requests
 from datetime import date, timedelta
 
-# Configuration
-BASE_URL = "http://127.0.0.1:8000"
-TEST_PHONE = "+1234567890"
-TEST_PASSWORD = "password123"
+from test_helpers import (
+    BASE_URL, SESSION, TEST_PASSWORD, TEST_PHONE, authenticate, bootstrap_session, read_first_item, read_json,
+    read_prefix, request_with_reauth, server_available, warm_up
+)
 
-def test_collection_endpoints():
-    """Test the key endpoints from the updated collection"""
+# Reservation request bodies are encoded once; only the date and table are filled in per run
+JSON_HEADERS = {"Content-Type": "application/json"}
+SMART_RESERVATION_BODY = json.dumps({
+    "selection_type": "smart",
+    "date": "__DATE__",
+    "time": "19:00",
+    "party_size": 2,
+    "duration_hours": 2,
+    "special_requests": "Window seat if possible",
+    "special_occasion": "anniversary",
+    "user_preferences": {
+        "quiet_area": True,
+        "window_seat": True,
+        "romantic_setting": True,
+        "near_kitchen": False,
+        "accessible": False
+    }
+}).encode()
+CUSTOMIZED_RESERVATION_BODY = json.dumps({
+    "selection_type": "customized",
+    "table_id": "__TABLE_ID__",
+    "date": "__DATE__",
+    "time": "20:00",
+    "party_size": 4,
+    "special_requests": "Birthday celebration",
+    "duration_hours": 2
+}).encode()
+
+def get_auth_token(session=SESSION, use_cache=True):
+    """Get authentication token for testing, reusing the one cached by an earlier run"""
+    return authenticate(session, BASE_URL, TEST_PHONE, TEST_PASSWORD, use_cache=use_cache)
+
+def test_collection_endpoints(session, token, restaurant):
+    """Test the reservation endpoints from the updated collection"""
+    restaurant_id = restaurant['id']
+    
+    # Test 3: Smart AI Reservation (NEW - from Reservations section)
+    print("\n3️⃣ Testing Smart AI Reservation...")
+    tomorrow_str = (date.today() + timedelta(days=1)).isoformat()
+    
+    date_bytes = tomorrow_str.encode()
+    smart_body = SMART_RESERVATION_BODY.replace(b"__DATE__", date_bytes)
+    
+    smart_response = request_with_reauth(
+        session, "POST",
+        f"{BASE_URL}/api/restaurants/{restaurant_id}/reserve/",
+        get_auth_token,
+        data=smart_body,
+        headers=JSON_HEADERS
+    )
+    
+    if smart_response.status_code == 201:
+        result = read_json(smart_response)
+        reservation = result['reservation']
+        print("✅ Smart AI Reservation created successfully!")
+        print(f"   Reservation ID: {reservation['id']}")
+        print(f"   Table: {reservation['table']['number']}")
+        
+        ai_info = result.get('ai_selection')
+        if ai_info:
+            print(f"   AI Method: {ai_info['method']}")
+            print(f"   AI Confidence: {ai_info['confidence']:.2f}")
+            print(f"   AI Reasoning: {ai_info['reasoning'][:100]}...")
+    else:
+        print(f"❌ Smart reservation failed: {smart_response.status_code}")
+        print(f"   Error: {read_prefix(smart_response)}...")
+    
+    # Test 4: Customized Reservation (UPDATED - from Reservations section)
+    print("\n4️⃣ Testing Customized Reservation...")
+    
+    # Look tables up only after the smart booking has landed: its 19:00-21:00 window
+    # overlaps this one, so an earlier lookup could offer the table it just took
+    tables_response = request_with_reauth(
+        session, "GET",
+        f"{BASE_URL}/api/restaurants/{restaurant_id}/available-tables/",
+        get_auth_token,
+        params={
+            "date": tomorrow_str,
+            "time": "20:00",
+            "party_size": 4,
+            "duration_hours": 2
+        }
+    )
+    
+    if tables_response.status_code == 200:
+        first_table = read_first_item(tables_response)
+        if first_table:
+            table_id = first_table['id']
+            
+            customized_body = CUSTOMIZED_RESERVATION_BODY.replace(
+                b"__DATE__", date_bytes
+            ).replace(b'"__TABLE_ID__"', str(table_id).encode())
+            
+            customized_response = request_with_reauth(
+                session, "POST",
+                f"{BASE_URL}/api/restaurants/{restaurant_id}/reserve/",
+                get_auth_token,
+                data=customized_body,
+                headers=JSON_HEADERS
+            )
+            
+            if customized_response.status_code == 201:
+                reservation = read_json(customized_response)['reservation']
+                print("✅ Customized Reservation created successfully!")
+                print(f"   Reservation ID: {reservation['id']}")
+                print(f"   Selected Table: {reservation['table']['number']}")
+            else:
+                print(f"❌ Customized reservation failed: {customized_response.status_code}")
+        else:
+            print("⚠️  No available tables found for customized reservation")
+    else:
+        print(f"❌ Failed to get available tables: {tables_response.status_code}")
+
+def main():
+    """Log in, pick a restaurant, and run the collection tests against the dev server"""
     print("🧪 Testing Updated Postman Collection Endpoints")
     print("=" * 60)
     
-    # Test 1: Login (from Authentication section)
+    if not server_available(BASE_URL):
+        print(f"❌ Server not running on {BASE_URL}")
+        return
+    warm_up(BASE_URL)
+    
+    # Test 1 + 2: Login and Get Restaurants (reused from a recent run when possible)
     print("\n1️⃣ Testing Customer Login...")
-    login_response = requests.post(f"{BASE_URL}/api/accounts/login/", json={
-        "phone": TEST_PHONE,
-        "password": TEST_PASSWORD
-    })
+    session, token, restaurant = bootstrap_session(BASE_URL, TEST_PHONE, TEST_PASSWORD)
     
-    if login_response.status_code == 200:
-        token = login_response.json().get("access")
+    if token:
         print("✅ Login successful")
         
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        
-        # Test 2: Get Restaurants (from Restaurants section)
         print("\n2️⃣ Testing Get Restaurants...")
-        restaurants_response = requests.get(f"{BASE_URL}/api/restaurants/", headers=headers)
         
-        if restaurants_response.status_code == 200:
-            restaurants = restaurants_response.json()
-            if restaurants:
-                restaurant_id = restaurants[0]['id']
-                print(f"✅ Found {len(restaurants)} restaurants")
-                
-                # Test 3: Smart AI Reservation (NEW - from Reservations section)
-                print("\n3️⃣ Testing Smart AI Reservation...")
-                tomorrow = date.today() + timedelta(days=1)
-                
-                smart_reservation_data = {
-                    "selection_type": "smart",
-                    "date": tomorrow.strftime("%Y-%m-%d"),
-                    "time": "19:00",
-                    "party_size": 2,
-                    "duration_hours": 2,
-                    "special_requests": "Window seat if possible",
-                    "special_occasion": "anniversary",
-                    "user_preferences": {
-                        "quiet_area": True,
-                        "window_seat": True,
-                        "romantic_setting": True,
-                        "near_kitchen": False,
-                        "accessible": False
-                    }
-                }
-                
-                smart_response = requests.post(
-                    f"{BASE_URL}/api/restaurants/{restaurant_id}/reserve/",
-                    headers=headers,
-                    json=smart_reservation_data
-                )
-                
-                if smart_response.status_code == 201:
-                    result = smart_response.json()
-                    print("✅ Smart AI Reservation created successfully!")
-                    print(f"   Reservation ID: {result['reservation']['id']}")
-                    print(f"   Table: {result['reservation']['table']['number']}")
-                    
-                    if 'ai_selection' in result:
-                        ai_info = result['ai_selection']
-                        print(f"   AI Method: {ai_info['method']}")
-                        print(f"   AI Confidence: {ai_info['confidence']:.2f}")
-                        print(f"   AI Reasoning: {ai_info['reasoning'][:100]}...")
-                else:
-                    print(f"❌ Smart reservation failed: {smart_response.status_code}")
-                    print(f"   Error: {smart_response.text[:200]}...")
-                
-                # Test 4: Customized Reservation (UPDATED - from Reservations section)
-                print("\n4️⃣ Testing Customized Reservation...")
-                
-                # First get available tables
-                tables_response = requests.get(
-                    f"{BASE_URL}/api/restaurants/{restaurant_id}/available-tables/",
-                    headers=headers,
-                    params={
-                        "date": tomorrow.strftime("%Y-%m-%d"),
-                        "time": "20:00",
-                        "party_size": 4,
-                        "duration_hours": 2
-                    }
-                )
-                
-                if tables_response.status_code == 200:
-                    tables = tables_response.json()
-                    if tables:
-                        table_id = tables[0]['id']
-                        
-                        customized_reservation_data = {
-                            "selection_type": "customized",
-                            "table_id": table_id,
-                            "date": tomorrow.strftime("%Y-%m-%d"),
-                            "time": "20:00",
-                            "party_size": 4,
-                            "special_requests": "Birthday celebration",
-                            "duration_hours": 2
-                        }
-                        
-                        customized_response = requests.post(
-                            f"{BASE_URL}/api/restaurants/{restaurant_id}/reserve/",
-                            headers=headers,
-                            json=customized_reservation_data
-                        )
-                        
-                        if customized_response.status_code == 201:
-                            result = customized_response.json()
-                            print("✅ Customized Reservation created successfully!")
-                            print(f"   Reservation ID: {result['reservation']['id']}")
-                            print(f"   Selected Table: {result['reservation']['table']['number']}")
-                        else:
-                            print(f"❌ Customized reservation failed: {customized_response.status_code}")
-                    else:
-                        print("⚠️  No available tables found for customized reservation")
-                else:
-                    print(f"❌ Failed to get available tables: {tables_response.status_code}")
-                
-            else:
-                print("⚠️  No restaurants found")
+        if restaurant:
+            print(f"✅ Using restaurant: {restaurant['name']} (ID: {restaurant['id']})")
+            test_collection_endpoints(session, token, restaurant)
         else:
-            print(f"❌ Failed to get restaurants: {restaurants_response.status_code}")
+            print("⚠️  No restaurants found")
     else:
-        print(f"❌ Login failed: {login_response.status_code}")
-        print(f"   Error: {login_response.text}")
+        print("❌ Login failed")
     
     print("\n" + "=" * 60)
     print("🏁 Collection testing completed!")
@@ -150,4 +160,4 @@ def test_collection_endpoints():
     print("✅ Updated collection info with AI capabilities")
 
 if __name__ == "__main__":
-    test_collection_endpoints()
\ No newline at end of file
+    main()
\ No newline at end of file
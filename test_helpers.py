@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the HTTP test scripts
+"""
+import base64
+import json
+import os
+import socket
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson decodes response bodies several times faster when it is installed
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+_decoder = json.JSONDecoder()
+
+# Dev server and test customer the API test scripts run against
+BASE_URL = "http://127.0.0.1:8000"
+TEST_PHONE = "+1234567890"
+TEST_PASSWORD = "password123"
+
+# Where the last access token is kept between runs, with its expiry
+TOKEN_CACHE_PATH = os.path.join(tempfile.gettempdir(), ".rms-token")
+
+# Seconds before expiry at which a cached token is no longer used
+TOKEN_EXPIRY_MARGIN = 30
+
+# Where the restaurant picked by bootstrap_session is kept, and for how many seconds
+FIXTURE_CACHE_PATH = os.path.join(tempfile.gettempdir(), ".rms-fixture")
+FIXTURE_MAX_AGE = 300
+
+# (connect, read) timeout for every request; the dev server is local, so a slow
+# connect means it is not running, while AI-backed endpoints can take a while to answer
+REQUEST_TIMEOUT = (0.5, 30)
+
+
+class _TimeoutSession(requests.Session):
+    """Session that applies REQUEST_TIMEOUT to requests sent without their own timeout."""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+# Transient server errors are retried on the pooled connection. urllib3 only retries
+# idempotent methods by default, so POSTs that create reservations are never sent twice
+RETRY = Retry(total=3, backoff_factor=0.2, status_forcelist=(500, 502, 503, 504), raise_on_status=False)
+
+
+def new_session():
+    """Create a keep-alive session with the request timeout and retries applied."""
+    session = _TimeoutSession()
+    session.mount("http://", HTTPAdapter(max_retries=RETRY, pool_connections=4, pool_maxsize=8))
+    return session
+
+
+# One keep-alive session for every call a script makes, so they share pooled connections
+SESSION = new_session()
+
+
+def server_available(base_url, timeout=0.1):
+    """Check that something is listening at base_url before sending it any requests."""
+    parts = urlsplit(base_url)
+    try:
+        with socket.create_connection((parts.hostname, parts.port or 80), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def warm_up(base_url, session=SESSION):
+    """
+    Open a pooled connection to the server with a cheap HEAD request, so the first
+    real call is not also paying for the connection setup.
+    """
+    try:
+        session.head(f"{base_url}/", timeout=(0.5, 1.0))
+    except requests.RequestException:
+        pass
+
+
+def read_json(response):
+    """Decode a response body as JSON."""
+    return _loads(response.content)
+
+
+def read_prefix(response, size=200):
+    """Decode only the first size bytes of a response body, e.g. for error messages."""
+    return response.content[:size].decode(response.encoding or "utf-8", "replace")
+
+
+def read_first_item(response):
+    """
+    Decode only the first element of a JSON array response, or None if it is empty.
+
+    Callers that just need the first row skip building objects for the rest of the list.
+    A body that is not a JSON list, such as an error object or an HTML error page, is
+    reported and also gives None.
+    """
+    text = response.content.decode(response.encoding or "utf-8", "replace").lstrip()
+    if not text.startswith("["):
+        print(f"Expected a JSON list, got {response.status_code}: {read_prefix(response)}")
+        return None
+    start = 1
+    while start < len(text) and text[start].isspace():
+        start += 1
+    if text.startswith("]", start):
+        return None
+    try:
+        item, _ = _decoder.raw_decode(text, start)
+    except ValueError:
+        print(f"Malformed JSON list, got {response.status_code}: {read_prefix(response)}")
+        return None
+    return item
+
+
+def _load_cached_token(path=TOKEN_CACHE_PATH):
+    """Return the cached access token if it is still valid, otherwise None."""
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() < cached.get("exp", 0) - TOKEN_EXPIRY_MARGIN:
+        return cached.get("access")
+    return None
+
+
+def _save_cached_token(token, exp, path=TOKEN_CACHE_PATH):
+    """Write the access token and its expiry to a file only the current user can read."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump({"access": token, "exp": exp}, f)
+
+
+def clear_cached_token(path=TOKEN_CACHE_PATH):
+    """Forget the cached access token."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _token_expiry(token):
+    """Read the exp claim from a JWT without verifying it."""
+    payload = token.split(".")[1]
+    payload += "=" * (-len(payload) % 4)
+    return json.loads(base64.urlsafe_b64decode(payload))["exp"]
+
+
+def authenticate(session, base_url, phone, password, use_cache=True):
+    """
+    Get an access token, reusing the cached one from an earlier run when possible.
+
+    The token is also set as the session's bearer token. Returns None if login fails.
+    """
+    token = _load_cached_token() if use_cache else None
+    if not token:
+        response = session.post(f"{base_url}/api/accounts/login/", json={
+            "phone": phone,
+            "password": password
+        })
+        if response.status_code != 200:
+            print(f"Login failed: {response.status_code} - {response.text}")
+            return None
+        token = read_json(response).get("access")
+        _save_cached_token(token, _token_expiry(token))
+
+    session.headers["Authorization"] = f"Bearer {token}"
+    return token
+
+
+def request_with_reauth(session, method, url, login, **kwargs):
+    """
+    Send a request, logging in again and retrying once if the token was rejected.
+
+    login is called with the session and use_cache=False to fetch a fresh token.
+    """
+    response = session.request(method, url, **kwargs)
+    if response.status_code == 401:
+        clear_cached_token()
+        if login(session, use_cache=False):
+            response = session.request(method, url, **kwargs)
+    return response
+
+
+def bootstrap_session(base_url, phone, password, session=SESSION):
+    """
+    Log in and pick the first restaurant, the setup every API test script starts with.
+
+    The token and the restaurant are cached on disk, so runs within a few minutes of
+    each other skip both round trips. Returns (session, token, restaurant); token or
+    restaurant is None when that step fails. The token is set on session, the shared
+    SESSION unless another one is given.
+    """
+    def login(session=session, use_cache=True):
+        return authenticate(session, base_url, phone, password, use_cache=use_cache)
+
+    token = login()
+    if not token:
+        return session, None, None
+
+    try:
+        with open(FIXTURE_CACHE_PATH) as f:
+            fixture = json.load(f)
+        if fixture["base_url"] == base_url and time.time() - fixture["created"] < FIXTURE_MAX_AGE:
+            return session, token, fixture["restaurant"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    response = request_with_reauth(session, "GET", f"{base_url}/api/restaurants/", login)
+    if response.status_code != 200:
+        print(f"Failed to get restaurants: {response.status_code}")
+        return session, token, None
+
+    first_restaurant = read_first_item(response)
+    if not first_restaurant:
+        return session, token, None
+
+    restaurant = {"id": first_restaurant["id"], "name": first_restaurant["name"]}
+    with open(FIXTURE_CACHE_PATH, "w") as f:
+        json.dump({"base_url": base_url, "created": time.time(), "restaurant": restaurant}, f)
+    return session, token, restaurant
@@ -5,12 +5,16 @@ Test script to verify manager-only access to the approval system
 import os
 import sys
 import django
+from django.apps import apps
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, date, time
 
 # Setup Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rms.settings')
-django.setup()
+if not apps.ready:
+    django.setup()
 
+from django.db import connection, transaction
 from django.test import Client
 from django.contrib.auth import get_user_model
 from restaurants.models import Restaurant, Table, Reservation
@@ -19,44 +23,62 @@ from accounts.models import StaffProfile
 
 User = get_user_model()
 
+# Credentials each probe logs in with; None probes anonymously
+STAFF = ('+1222222222', 'staff123')
+MANAGER = ('+1111111111', 'manager123')
+
+DENIED = {302, 403}
+GRANTED = {200}
+
+# Sections of (credentials, path, accepted status codes, pass message, fail message)
+CHECKS = (
+    ("1. Testing staff member access to manager admin...", (
+        (STAFF, '/manager/', DENIED,
+         "Staff member correctly denied access to manager admin", "Staff member got access"),
+        (STAFF, '/manager/restaurants/reservation/', DENIED,
+         "Staff member correctly denied access to reservation approval", "Staff member got access to reservations"),
+        (STAFF, '/manager/orders/order/', DENIED,
+         "Staff member correctly denied access to order approval", "Staff member got access to orders"),
+    )),
+    ("\n2. Testing manager access to manager admin...", (
+        (MANAGER, '/manager/', GRANTED,
+         "Manager correctly granted access to manager admin", "Manager denied access"),
+        (MANAGER, '/manager/restaurants/reservation/', GRANTED,
+         "Manager correctly granted access to reservation approval", "Manager denied access to reservations"),
+        (MANAGER, '/manager/orders/order/', GRANTED,
+         "Manager correctly granted access to order approval", "Manager denied access to orders"),
+    )),
+    ("\n3. Testing staff member access to staff admin...", (
+        (STAFF, '/staff/', GRANTED,
+         "Staff member correctly granted access to staff admin", "Staff member denied access to staff admin"),
+    )),
+    ("\n4. Testing unauthenticated user access...", (
+        # Redirect to login
+        (None, '/manager/', {302},
+         "Unauthenticated user correctly redirected to login", "Unauthenticated user got unexpected response"),
+    )),
+)
+
+PROBES = [(credentials, path) for _, checks in CHECKS for credentials, path, *_ in checks]
+
+def _probe(probe):
+    """GET a path on a fresh client logged in with the probe's credentials and return the status code."""
+    credentials, path = probe
+    client = Client()
+    try:
+        if credentials:
+            phone, password = credentials
+            client.login(phone=phone, password=password)
+        return client.get(path).status_code
+    finally:
+        connection.close()
+
 def test_manager_access():
     """Test that only managers can access the approval system"""
     print("🧪 Testing Manager Access Control")
     print("=" * 50)
     
-    # Create test users
-    print("Creating test users...")
-    
-    # Create a regular staff member (not manager)
-    staff_user = User.objects.create_user(
-        phone='+1222222222',
-        password='staff123',
-        first_name='Staff',
-        last_name='Member',
-        is_staff_member=True,
-        is_staff=True
-    )
-    
-    # Create a restaurant
-    restaurant = Restaurant.objects.get_or_create(
-        name='Test Restaurant',
-        defaults={
-            'address': '123 Test St',
-            'phone': '+1987654321',
-            'description': 'Test restaurant',
-            'opening_time': time(9, 0),
-            'closing_time': time(22, 0)
-        }
-    )[0]
-    
-    # Create staff profile (not manager)
-    staff_profile = StaffProfile.objects.create(
-        user=staff_user,
-        role='waiter',  # Not manager
-        restaurant=restaurant
-    )
-    
-    # Get the manager user from demo data
+    # Get the manager user from demo data before creating anything
     try:
         manager_user = User.objects.get(phone='+1111111111')
         print(f"✅ Found manager user: {manager_user.first_name} {manager_user.last_name}")
@@ -64,80 +86,55 @@ def test_manager_access():
         print("❌ Manager user not found. Run demo_admin_approval.py first.")
         return
     
-    # Create test client
-    client = Client()
+    # Create test users, committing the whole setup at once
+    print("Creating test users...")
+    
+    with transaction.atomic():
+        # Create a regular staff member (not manager)
+        staff_user = User.objects.create_user(
+            phone='+1222222222',
+            password='staff123',
+            first_name='Staff',
+            last_name='Member',
+            is_staff_member=True,
+            is_staff=True
+        )
+        
+        # Create a restaurant
+        restaurant = Restaurant.objects.get_or_create(
+            name='Test Restaurant',
+            defaults={
+                'address': '123 Test St',
+                'phone': '+1987654321',
+                'description': 'Test restaurant',
+                'opening_time': time(9, 0),
+                'closing_time': time(22, 0)
+            }
+        )[0]
+        
+        # Create staff profile (not manager)
+        StaffProfile.objects.create(
+            user=staff_user,
+            role='waiter',  # Not manager
+            restaurant=restaurant
+        )
+    
+    # Every probe is an independent request, so run them all at once, each on
+    # its own client logged in as the probing user
+    with ThreadPoolExecutor(max_workers=len(PROBES)) as executor:
+        statuses = dict(zip(PROBES, executor.map(_probe, PROBES)))
     
     print("\n🔒 Testing Access Control:")
     print("-" * 30)
     
-    # Test 1: Staff member (non-manager) trying to access manager admin
-    print("1. Testing staff member access to manager admin...")
-    client.login(phone='+1222222222', password='staff123')
-    
-    response = client.get('/manager/')
-    if response.status_code == 302 or response.status_code == 403:
-        print("   ✅ PASS: Staff member correctly denied access to manager admin")
-    else:
-        print(f"   ❌ FAIL: Staff member got access (status: {response.status_code})")
-    
-    response = client.get('/manager/restaurants/reservation/')
-    if response.status_code == 302 or response.status_code == 403:
-        print("   ✅ PASS: Staff member correctly denied access to reservation approval")
-    else:
-        print(f"   ❌ FAIL: Staff member got access to reservations (status: {response.status_code})")
-    
-    response = client.get('/manager/orders/order/')
-    if response.status_code == 302 or response.status_code == 403:
-        print("   ✅ PASS: Staff member correctly denied access to order approval")
-    else:
-        print(f"   ❌ FAIL: Staff member got access to orders (status: {response.status_code})")
-    
-    client.logout()
-    
-    # Test 2: Manager accessing manager admin
-    print("\n2. Testing manager access to manager admin...")
-    client.login(phone='+1111111111', password='manager123')
-    
-    response = client.get('/manager/')
-    if response.status_code == 200:
-        print("   ✅ PASS: Manager correctly granted access to manager admin")
-    else:
-        print(f"   ❌ FAIL: Manager denied access (status: {response.status_code})")
-    
-    response = client.get('/manager/restaurants/reservation/')
-    if response.status_code == 200:
-        print("   ✅ PASS: Manager correctly granted access to reservation approval")
-    else:
-        print(f"   ❌ FAIL: Manager denied access to reservations (status: {response.status_code})")
-    
-    response = client.get('/manager/orders/order/')
-    if response.status_code == 200:
-        print("   ✅ PASS: Manager correctly granted access to order approval")
-    else:
-        print(f"   ❌ FAIL: Manager denied access to orders (status: {response.status_code})")
-    
-    client.logout()
-    
-    # Test 3: Staff member can access staff admin (read-only)
-    print("\n3. Testing staff member access to staff admin...")
-    client.login(phone='+1222222222', password='staff123')
-    
-    response = client.get('/staff/')
-    if response.status_code == 200:
-        print("   ✅ PASS: Staff member correctly granted access to staff admin")
-    else:
-        print(f"   ❌ FAIL: Staff member denied access to staff admin (status: {response.status_code})")
-    
-    client.logout()
-    
-    # Test 4: Unauthenticated user
-    print("\n4. Testing unauthenticated user access...")
-    
-    response = client.get('/manager/')
-    if response.status_code == 302:  # Redirect to login
-        print("   ✅ PASS: Unauthenticated user correctly redirected to login")
-    else:
-        print(f"   ❌ FAIL: Unauthenticated user got unexpected response (status: {response.status_code})")
+    for heading, checks in CHECKS:
+        print(heading)
+        for credentials, path, accepted, passed, failed in checks:
+            status_code = statuses[(credentials, path)]
+            if status_code in accepted:
+                print(f"   ✅ PASS: {passed}")
+            else:
+                print(f"   ❌ FAIL: {failed} (status: {status_code})")
     
     print("\n🎯 Access Control Summary:")
     print("=" * 50)
@@ -155,9 +152,8 @@ def test_manager_access():
     print("• Secure status transition validation")
     print("• Audit trail for all changes")
     
-    # Clean up test data
+    # Clean up test data (the staff profile is deleted with its user)
     staff_user.delete()
-    staff_profile.delete()
     
     print("\n✅ Access control test completed successfully!")
 
@@ -2,68 +2,28 @@
 """
 Test script for smart AI-powered table reservation
 """
-import requests
 import json
 from datetime import date, timedelta
 
-# Configuration
-BASE_URL = "http://127.0.0.1:8000"
-TEST_PHONE = "+1234567890"
-TEST_PASSWORD = "password123"
+from test_helpers import (
+    BASE_URL, SESSION, TEST_PASSWORD, TEST_PHONE, authenticate, bootstrap_session, read_json, request_with_reauth,
+    server_available, warm_up
+)
 
-def get_auth_token():
-    """Get authentication token for testing"""
-    login_data = {
-        "phone": TEST_PHONE,
-        "password": TEST_PASSWORD
-    }
-    
-    response = requests.post(f"{BASE_URL}/api/accounts/login/", json=login_data)
-    if response.status_code == 200:
-        return response.json().get("access")
-    else:
-        print(f"Login failed: {response.status_code} - {response.text}")
-        return None
+def get_auth_token(session=SESSION, use_cache=True):
+    """Get authentication token for testing, reusing the one cached by an earlier run"""
+    return authenticate(session, BASE_URL, TEST_PHONE, TEST_PASSWORD, use_cache=use_cache)
 
-def test_smart_reservation():
+def test_smart_reservation(session, token, restaurant):
     """Test smart AI-powered reservation creation"""
-    print("🤖 Testing Smart AI-Powered Table Reservation")
-    print("=" * 50)
-    
-    # Get auth token
-    token = get_auth_token()
-    if not token:
-        print("❌ Failed to get authentication token")
-        return
-    
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    
-    # Get available restaurants
-    print("\n📍 Getting available restaurants...")
-    restaurants_response = requests.get(f"{BASE_URL}/api/restaurants/", headers=headers)
-    
-    if restaurants_response.status_code != 200:
-        print(f"❌ Failed to get restaurants: {restaurants_response.status_code}")
-        return
-    
-    restaurants = restaurants_response.json()
-    if not restaurants:
-        print("❌ No restaurants available")
-        return
-    
-    restaurant = restaurants[0]
     restaurant_id = restaurant['id']
-    print(f"✅ Using restaurant: {restaurant['name']} (ID: {restaurant_id})")
     
     # Test smart reservation
-    tomorrow = date.today() + timedelta(days=1)
+    tomorrow_str = (date.today() + timedelta(days=1)).isoformat()
     reservation_data = {
         "selection_type": "smart",
         "party_size": 2,
-        "date": tomorrow.strftime("%Y-%m-%d"),
+        "date": tomorrow_str,
         "time": "19:00",
         "duration_hours": 2,
         "special_requests": "Window seat if possible",
@@ -82,24 +42,27 @@ def test_smart_reservation():
     print(f"   Special occasion: {reservation_data['special_occasion']}")
     print(f"   Preferences: {reservation_data['user_preferences']}")
     
-    response = requests.post(
+    response = request_with_reauth(
+        session, "POST",
         f"{BASE_URL}/api/restaurants/{restaurant_id}/reserve/",
-        headers=headers,
+        get_auth_token,
         json=reservation_data
     )
     
     print(f"\n📊 Response Status: {response.status_code}")
     
     if response.status_code == 201:
-        result = response.json()
+        result = read_json(response)
+        reservation = result['reservation']
+        table = reservation['table']
         print("✅ Smart reservation created successfully!")
-        print(f"   Reservation ID: {result['reservation']['id']}")
-        print(f"   Table: {result['reservation']['table']['number']} (Capacity: {result['reservation']['table']['capacity']})")
-        print(f"   Status: {result['reservation']['status']}")
+        print(f"   Reservation ID: {reservation['id']}")
+        print(f"   Table: {table['number']} (Capacity: {table['capacity']})")
+        print(f"   Status: {reservation['status']}")
         
         # Check if AI selection info is included
-        if 'ai_selection' in result:
-            ai_info = result['ai_selection']
+        ai_info = result.get('ai_selection')
+        if ai_info:
             print(f"\n🤖 AI Selection Details:")
             print(f"   Method: {ai_info['method']}")
             print(f"   Confidence: {ai_info['confidence']:.2f}")
@@ -114,9 +77,33 @@ def test_smart_reservation():
             
     else:
         print(f"❌ Reservation failed: {response.text}")
+
+def main():
+    """Log in, pick a restaurant, and run the smart reservation test against the dev server"""
+    print("🤖 Testing Smart AI-Powered Table Reservation")
+    print("=" * 50)
+    
+    if not server_available(BASE_URL):
+        print(f"❌ Server not running on {BASE_URL}")
+        return
+    warm_up(BASE_URL)
+    
+    # Log in and pick a restaurant (reused from a recent run when possible)
+    print("\n📍 Getting available restaurants...")
+    session, token, restaurant = bootstrap_session(BASE_URL, TEST_PHONE, TEST_PASSWORD)
+    if not token:
+        print("❌ Failed to get authentication token")
+        return
+    
+    if not restaurant:
+        print("❌ No restaurants available")
+        return
+    
+    print(f"✅ Using restaurant: {restaurant['name']} (ID: {restaurant['id']})")
+    test_smart_reservation(session, token, restaurant)
     
     print("\n" + "=" * 50)
     print("🏁 Test completed!")
 
 if __name__ == "__main__":
-    test_smart_reservation()
\ No newline at end of file
+    main()
\ No newline at end of file